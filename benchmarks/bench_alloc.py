@@ -0,0 +1,94 @@
+"""
+Allocation benchmark for move generation.
+
+Run from the repository root:
+    python -m benchmarks.bench_alloc
+
+Uses tracemalloc to measure the memory allocated while generating moves at each
+node, comparing fresh lists from generate_moves() with a preallocated MoveStack,
+then times a fixed-depth depth-first walk with each.
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from benchmarks.positions import random_state
+from src.simulator.move_gen import MoveStack, generate_moves
+
+
+def sample_positions(count: int, seed: int):
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        state = random_state(rng)
+        for _ in range(rng.randrange(20)):
+            moves = generate_moves(state)
+            if not moves:
+                break
+            state.apply_move(moves[rng.randrange(len(moves))])
+        positions.append(state)
+    return positions
+
+
+def bytes_per_node(positions, generate) -> float:
+    """Average peak memory allocated by one generate(state) call, result kept alive"""
+    total = 0
+    tracemalloc.start()
+    for state in positions:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        result = generate(state)
+        total += tracemalloc.get_traced_memory()[1] - before
+        del result
+    tracemalloc.stop()
+    return total / len(positions)
+
+
+def walk_lists(state, depth: int) -> int:
+    if depth == 0:
+        return 1
+    nodes = 1
+    for move in generate_moves(state):
+        token = state.apply_move(move)
+        nodes += walk_lists(state, depth - 1)
+        state.undo_move(token)
+    return nodes
+
+
+def walk_stack(state, depth: int, stack: MoveStack, ply: int = 0) -> int:
+    if depth == 0:
+        return 1
+    nodes = 1
+    buffer = stack.buffers[ply]
+    for index in range(stack.generate(state, ply)):
+        token = state.apply_move(buffer[index])
+        nodes += walk_stack(state, depth - 1, stack, ply + 1)
+        state.undo_move(token)
+    return nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure move-generation allocations per node")
+    parser.add_argument("--positions", type=int, default=2000)
+    parser.add_argument("--depth", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    positions = sample_positions(args.positions, args.seed)
+    stack = MoveStack(args.depth + 1)
+    print("bytes allocated per node (tracemalloc)")
+    print(f"  generate_moves list: {bytes_per_node(positions, generate_moves):8.1f}")
+    print(f"  MoveStack.generate:  {bytes_per_node(positions, lambda s: stack.generate(s, 0)):8.1f}")
+
+    for name, walk in (("list", lambda s: walk_lists(s, args.depth)),
+                       ("stack", lambda s: walk_stack(s, args.depth, stack))):
+        start = time.perf_counter()
+        nodes = sum(walk(state) for state in positions[:50])
+        elapsed = time.perf_counter() - start
+        print(f"depth-{args.depth} walk ({name}): {nodes:,} nodes, {nodes / elapsed:,.0f} nodes/s")
+
+
+if __name__ == "__main__":
+    main()
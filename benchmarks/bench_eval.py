@@ -0,0 +1,48 @@
+"""
+Leaf evaluation benchmark: scalar Evaluator against the NumPy batch evaluator.
+
+Run from the repository root:
+    python -m benchmarks.bench_eval [--positions 10000]
+
+Scores the same positions one at a time with Evaluator.evaluate (caches cleared
+first) and in one call to evaluate_batch, and checks that the scores agree.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_alloc import sample_positions
+from src.simulator.batch import evaluate_batch, stack_states
+from src.simulator.evaluator import Evaluator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare scalar and batch leaf evaluation")
+    parser.add_argument("--positions", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    positions = sample_positions(args.positions, args.seed)
+    evaluator = Evaluator()
+    for state in positions:
+        state._evaluation_cache = None
+
+    start = time.perf_counter()
+    scalar = np.array([evaluator.evaluate(state) for state in positions])
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    boards, _ = stack_states(positions)
+    batch = evaluate_batch(boards, evaluator)
+    batch_time = time.perf_counter() - start
+
+    print(f"{len(positions):,} positions")
+    print(f"  scalar: {scalar_time * 1e3:8.2f} ms  ({len(positions) / scalar_time:,.0f} positions/s)")
+    print(f"  batch:  {batch_time * 1e3:8.2f} ms  ({len(positions) / batch_time:,.0f} positions/s)")
+    print(f"  scores identical: {bool(np.array_equal(scalar, batch))}")
+
+
+if __name__ == "__main__":
+    main()
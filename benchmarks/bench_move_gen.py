@@ -0,0 +1,66 @@
+"""
+Benchmark for simulator.move_gen.
+
+Run from the repository root:
+    python -m benchmarks.bench_move_gen
+
+Reports the cost of generate_moves() per call and per gap for increasing gap
+counts (the cost per gap should stay flat), then the node rate of a random
+apply_move/undo_move walk against the README's 50,000 positions/second target.
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.positions import random_state
+from src.context import ProjectContext
+from src.simulator.move_gen import generate_moves
+
+
+def bench_generate(positions: int, repeats: int, seed: int):
+    print("generate_moves()")
+    for gaps in (4, 8, 16, 32):
+        rng = random.Random(seed)
+        states = [random_state(rng, gaps) for _ in range(positions)]
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for state in states:
+                generate_moves(state)
+        elapsed = time.perf_counter() - start
+        per_call = elapsed / (positions * repeats) * 1e9
+        print(f"  {gaps:2d} gaps: {per_call:8.0f} ns/call  {per_call / gaps:6.0f} ns/gap")
+
+
+def bench_walk(nodes: int, seed: int):
+    rng = random.Random(seed)
+    state = random_state(rng)
+    tokens = []
+    start = time.perf_counter()
+    for _ in range(nodes):
+        moves = state.legal_moves()
+        if moves and (not tokens or rng.random() < 0.7):
+            tokens.append(state.apply_move(moves[rng.randrange(len(moves))]))
+        elif tokens:
+            state.undo_move(tokens.pop())
+        else:
+            state = random_state(rng)
+    elapsed = time.perf_counter() - start
+    rate = nodes / elapsed
+    target = ProjectContext.PERFORMANCE.search_speed_positions_per_second
+    print(f"random walk: {rate:,.0f} nodes/s (target {target:,})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark legal move generation")
+    parser.add_argument("--positions", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--nodes", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    bench_generate(args.positions, args.repeats, args.seed)
+    bench_walk(args.nodes, args.seed)
+
+
+if __name__ == "__main__":
+    main()
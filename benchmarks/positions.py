@@ -0,0 +1,15 @@
+"""Seeded random positions shared by the benchmarks."""
+
+import random
+
+from src.simulator.cards import DECK, GAP
+from src.simulator.game_state import GameState
+
+
+def random_state(rng: random.Random, gaps: int = 4) -> GameState:
+    """Shuffle the 48-card deck plus gaps into a fresh position; extra gaps replace cards"""
+    cells = list(DECK)
+    rng.shuffle(cells)
+    cells = cells[:52 - gaps] + [GAP] * gaps
+    rng.shuffle(cells)
+    return GameState.from_key(bytes(code & 0xFF for code in cells), validate=False)
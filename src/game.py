@@ -3,6 +3,7 @@ import time
 from src.layout import LayoutRenderer
 from src.input_handler import InputHandler
 from src.validator import CardValidator
+from src.simulator.game_state import GameState
 
 class GameManager:
     def __init__(self):
@@ -68,49 +69,17 @@ class GameManager:
             reshuffles_remaining -= 1
 
         print("\nFinal Layout:")
-        layout.display_full_board(self.current_game[3])
+        layout.display_full_board(next(board for board in reversed(self.current_game) if board))
         print("Ready to begin analyzing.")
 
     def compute_prepopulated_cells(self, flat_board):
         skip_cells = set()
         prepopulated = {}
 
+        locked_len = GameState.locked_lengths(flat_board)
         for row_idx in range(4):
-            sequence = []
-            for col in range(13):
-                card = flat_board[row_idx * 13 + col]
-                if card == "--" or len(card) != 2:
-                    break
-                rank, suit = card[0], card[1]
-
-                try:
-                    value = self.card_rank_value(rank)
-                except ValueError:
-                    break
-
-                if value == 2:
-                    sequence.append((col, card))
-                    continue
-
-                if not sequence:
-                    break  # Only start tracking from a 2
-
-                prev_val, prev_suit = self.card_rank_value(sequence[-1][1][0]), sequence[-1][1][1]
-                if value == prev_val + 1 and suit == prev_suit:
-                    sequence.append((col, card))
-                else:
-                    break  # Stop if sequence breaks
-
-            for col_idx, card in sequence:
+            for col_idx in range(locked_len[row_idx]):
                 skip_cells.add((row_idx, col_idx))
-                prepopulated[(row_idx, col_idx)] = card
+                prepopulated[(row_idx, col_idx)] = flat_board[row_idx * 13 + col_idx]
 
         return skip_cells, prepopulated
-
-    def card_rank_value(self, rank):
-        ranks = {'2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7,
-                 '8': 8, '9': 9, 'X': 10, 'J': 11, 'Q': 12, 'K': 13}
-        r = rank.upper()
-        if r not in ranks:
-            raise ValueError(f"Invalid rank: {rank}")
-        return ranks[r]
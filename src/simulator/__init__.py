@@ -7,8 +7,17 @@ the strategic principles and performance targets outlined in the project context
 
 # This module structure follows the planned architecture from README.md:
 # src/simulator/
+# ├── batch.py       # NumPy batch operations over many positions
+# ├── cards.py       # Integer card encoding and lookup tables
+# ├── deadlock.py    # Dependency graph and stuck-card analysis
 # ├── game_state.py  # Efficient board representation
+# ├── symmetry.py    # Row/suit symmetry canonicalization
 # ├── move_gen.py    # Legal move generation
+# ├── perft.py       # Move-generation node counting tool
+# ├── repetition.py  # Path-local cycle detection
 # ├── evaluator.py   # Position evaluation and scoring
+# ├── selfplay.py    # Seeded greedy self-play games
+# ├── tuning.py      # Evaluator weight fitting from self-play
+# ├── value_net.py   # NumPy MLP value network and trainer
 # ├── search.py      # Tree search algorithms
 # └── optimizer.py   # Multi-phase strategic planning
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""
+Vectorized NumPy operations over batches of positions.
+
+Monte Carlo rollouts and beam search hold thousands of positions at once. This
+module works on them as arrays: boards is (N, 52) int8 of card codes with GAP
+(-1) in empty slots, i.e. GameState.cells stacked, and locs is (N, 52) int8
+mapping each card code to its slot, i.e. GameState.loc stacked. There is no
+Python loop over boards.
+
+Requires NumPy, unlike the rest of the simulator.
+"""
+
+from typing import Optional, Sequence, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from src.simulator.cards import (
+    ROWS, COLS, GAP, NUM_SLOTS, TWOS, CARD_RANK, CARD_SUCC, MOVE_SHIFT
+)
+from src.simulator.evaluator import FEATURE_NAMES, REDEAL_TABLE, Evaluator
+from src.simulator.move_gen import MAX_MOVES
+
+if TYPE_CHECKING:
+    from src.simulator.game_state import GameState
+
+GAPS_PER_BOARD = 4
+
+# Same trailing GAP entry as the Python tables, so raw int8 cells index them directly
+SUCC_TABLE = np.array(CARD_SUCC, dtype=np.int8)
+RANK_TABLE = np.array(CARD_RANK, dtype=np.int8)
+# Expected growable rows after a redeal, indexed [unlocked cells, unstarted rows, complete rows]
+REDEAL_LOCKABLE = np.array(REDEAL_TABLE, dtype=np.float64)[:, :, :, 1]
+TWOS_ARRAY = np.array(TWOS, dtype=np.intp)
+
+
+def stack_states(states: Sequence['GameState']) -> Tuple[np.ndarray, np.ndarray]:
+    """Stack GameStates into (boards, locs) int8 arrays of shape (N, 52)"""
+    boards = np.frombuffer(b"".join(state.cells.tobytes() for state in states), dtype=np.int8)
+    locs = np.frombuffer(b"".join(state.loc.tobytes() for state in states), dtype=np.int8)
+    return boards.reshape(-1, NUM_SLOTS), locs.reshape(-1, NUM_SLOTS)
+
+
+def board_gaps(boards: np.ndarray) -> np.ndarray:
+    """
+    Gap slots of every board as an (N, 4) array in ascending slot order.
+
+    Raises:
+        ValueError: If any board does not have exactly four gaps
+    """
+    rows, slots = np.nonzero(boards == GAP)
+    if len(slots) != GAPS_PER_BOARD * len(boards) or np.any(
+            np.bincount(rows, minlength=len(boards)) != GAPS_PER_BOARD):
+        raise ValueError(f"Every board must have exactly {GAPS_PER_BOARD} gaps")
+    return slots.reshape(-1, GAPS_PER_BOARD)
+
+
+def generate_moves_batch(boards: np.ndarray, locs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Legal moves of N boards at once, matching move_gen.generate_moves per board.
+
+    A board has at most one move per ordinary gap, but a column-0 gap can take any
+    movable 2, so rows are padded to MAX_MOVES (16) rather than four.
+
+    Returns:
+        Tuple of (moves, counts): moves is (N, MAX_MOVES) int16 of src << 6 | dst
+        codes padded with -1, and counts is (N,) with the number of legal moves
+    """
+    n = len(boards)
+    batch = np.arange(n)[:, None]
+    gaps = board_gaps(boards)
+    at_row_start = gaps % COLS == 0
+
+    # Ordinary gaps: the left neighbour's successor, found through the location index
+    left = boards[batch, gaps - 1]  # Wraps to the previous row for column 0, masked below
+    successor = SUCC_TABLE[left]
+    src = locs[batch, successor].astype(np.int16)
+    valid = ~at_row_start & (successor >= 0) & (src >= 0)
+    moves = (src << MOVE_SHIFT) | gaps
+
+    # Column-0 gaps: every 2 that is on the board and not already locked in column 0
+    twos_src = locs[:, TWOS_ARRAY].astype(np.int16)
+    movable = (twos_src >= 0) & (twos_src % COLS != 0)
+    valid_twos = at_row_start[:, :, None] & movable[:, None, :]
+    two_moves = (twos_src[:, None, :] << MOVE_SHIFT) | gaps[:, :, None]
+
+    candidates = np.concatenate([moves, two_moves.reshape(n, -1)], axis=1).astype(np.int16)
+    candidate_valid = np.concatenate([valid, valid_twos.reshape(n, -1)], axis=1)
+
+    # Compact valid moves to the front of each row
+    order = np.argsort(~candidate_valid, axis=1, kind="stable")[:, :MAX_MOVES]
+    packed = np.take_along_axis(candidates, order, axis=1)
+    packed_valid = np.take_along_axis(candidate_valid, order, axis=1)
+    packed[~packed_valid] = -1
+    return packed, candidate_valid.sum(axis=1)
+
+
+def locked_mask(boards: np.ndarray) -> np.ndarray:
+    """
+    Which cells of N boards belong to their row's locked run.
+
+    Locked runs are recomputed from the cells: a row's run is the longest prefix
+    that starts with a 2 and continues in suit order, which is exactly what
+    GameState maintains incrementally.
+
+    Returns:
+        (N, 4, 13) bool array
+    """
+    rows = boards.reshape(-1, ROWS, COLS)
+    # Offsets stay within int8: at most King of spades (51) + 12
+    in_run = rows == rows[:, :, :1] + np.arange(COLS, dtype=np.int8)
+    in_run[:, :, 0] = RANK_TABLE[rows[:, :, 0]] == 2
+    # The run ends at the first mismatch; column 12 never matches, since 2 + 12 is no card
+    return np.logical_and.accumulate(in_run, axis=2)
+
+
+def features_batch(boards: np.ndarray) -> np.ndarray:
+    """
+    Evaluation features of N boards at once, matching evaluator.features per board.
+
+    Returns:
+        (N, len(FEATURE_NAMES)) float64 array in FEATURE_NAMES order
+    """
+    rows = boards.reshape(-1, ROWS, COLS)
+    locked_len = locked_mask(boards).sum(axis=2)
+
+    left = rows[:, :, :-1]
+    right = rows[:, :, 1:]
+    king_traps = np.count_nonzero((right == GAP) & (RANK_TABLE[left] == 13), axis=(1, 2))
+    chained = np.count_nonzero((right == left + 1) & (right != GAP), axis=(1, 2))
+
+    locked = locked_len.sum(axis=1)
+    redeal_lockable = REDEAL_LOCKABLE[
+        NUM_SLOTS - locked,
+        np.count_nonzero(locked_len == 0, axis=1),
+        np.count_nonzero(locked_len == COLS - 1, axis=1),
+    ]
+
+    return np.stack([
+        locked,
+        np.count_nonzero(rows[:, :, 0] == GAP, axis=1),
+        king_traps,
+        locked_len.max(axis=1) - locked_len.min(axis=1),
+        chained,
+        redeal_lockable,
+    ], axis=1)
+
+
+def evaluate_batch(boards: np.ndarray, evaluator: Optional[Evaluator] = None) -> np.ndarray:
+    """
+    Scores of N boards at once, equal to evaluator.evaluate on each board.
+
+    Weighted terms are accumulated in FEATURE_NAMES order in float64, the same
+    order and precision as Evaluator.score, so scores match bit for bit.
+
+    Returns:
+        (N,) float64 array of scores
+    """
+    evaluator = evaluator or Evaluator()
+    values = features_batch(boards)
+    total = np.zeros(len(boards), dtype=np.float64)
+    for index in range(len(FEATURE_NAMES)):
+        total += values[:, index] * evaluator.weights[index]
+    return total
@@ -0,0 +1,80 @@
+"""
+Canonical integer card encoding and precomputed lookup tables.
+
+Every card on the hot path is a small int: code = suit * 13 + (rank - 1), giving
+0-51 with the removed Aces at codes 0, 13, 26 and 39. Same-suit successors are
+therefore adjacent codes, and boards fit directly into signed byte buffers.
+
+Each per-card table has 53 entries: the extra last entry describes GAP (-1), so
+a table can be indexed with a raw cell value without checking for gaps first.
+"""
+
+from typing import Dict, List, Tuple
+
+# Board geometry: slot = row * 13 + col
+ROWS = 4
+COLS = 13
+NUM_SLOTS = ROWS * COLS
+MAX_LOCKED = ROWS * (COLS - 1)  # A won board: 2..K in every row, last column empty
+
+GAP = -1  # Sentinel stored in empty slots
+NO_CARD = -1  # Table value for "no such card" (successor of a King, predecessor of a 2)
+OFF_BOARD = -1  # Location index value for cards not on the board
+
+RANK_CHARS = "A23456789XJQK"  # Indexed by rank - 1, matches CardValidator's normalized form
+SUIT_CHARS = "CDHS"  # Indexed by suit 0-3
+
+
+def encode_card(rank: int, suit: int) -> int:
+    """Encode a rank 2-13 and suit 0-3 as a card code"""
+    return suit * COLS + rank - 1
+
+
+# All 48 codes in play, Aces excluded
+DECK: Tuple[int, ...] = tuple(encode_card(rank, suit) for suit in range(4) for rank in range(2, 14))
+
+# Codes of the four 2s, indexed by suit
+TWOS: Tuple[int, ...] = tuple(encode_card(2, suit) for suit in range(4))
+KINGS: Tuple[int, ...] = tuple(encode_card(13, suit) for suit in range(4))
+
+CARD_RANK: List[int] = [code % COLS + 1 for code in range(NUM_SLOTS)] + [0]
+CARD_SUIT: List[int] = [code // COLS for code in range(NUM_SLOTS)] + [-1]
+CARD_SUCC: List[int] = [
+    code + 1 if 2 <= CARD_RANK[code] < 13 else NO_CARD for code in range(NUM_SLOTS)
+] + [NO_CARD]
+CARD_PRED: List[int] = [
+    code - 1 if CARD_RANK[code] > 2 else NO_CARD for code in range(NUM_SLOTS)
+] + [NO_CARD]
+CARD_NAME: List[str] = [
+    RANK_CHARS[code % COLS] + SUIT_CHARS[code // COLS] for code in range(NUM_SLOTS)
+] + ["--"]
+
+# Parse table for flat-board strings: normalized names ("4C", "XD", "--") plus the raw
+# lowercase and gap spellings accepted by CardValidator and found in saves/*.json
+NAME_TO_CODE: Dict[str, int] = {}
+for _code in DECK:
+    NAME_TO_CODE[CARD_NAME[_code]] = _code
+    NAME_TO_CODE[CARD_NAME[_code].lower()] = _code
+for _gap_name in ("--", "-", "g", "G", " "):
+    NAME_TO_CODE[_gap_name] = GAP
+del _code, _gap_name
+
+# Bit per card code; a complete deal sets exactly these bits
+FULL_DECK_MASK = sum(1 << code for code in DECK)
+
+# Per-slot geometry
+SLOT_ROW: List[int] = [slot // COLS for slot in range(NUM_SLOTS)]
+SLOT_COL: List[int] = [slot % COLS for slot in range(NUM_SLOTS)]
+ROW_START_SLOTS: Tuple[int, ...] = tuple(range(0, NUM_SLOTS, COLS))
+IS_ROW_START: List[bool] = [slot % COLS == 0 for slot in range(NUM_SLOTS)]
+ALL_SLOTS_MASK = (1 << NUM_SLOTS) - 1
+ROW_START_MASK = sum(1 << slot for slot in ROW_START_SLOTS)
+
+# Moves pack the source and target slots into one int: src << 6 | dst
+MOVE_SHIFT = 6
+MOVE_MASK = (1 << MOVE_SHIFT) - 1
+
+
+def encode_move(src: int, dst: int) -> int:
+    """Pack a card move from slot src into gap slot dst"""
+    return (src << MOVE_SHIFT) | dst
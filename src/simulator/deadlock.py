@@ -0,0 +1,145 @@
+"""
+Static dependency graph and deadlock analysis for the current phase.
+
+A card can only move into the cell right of its predecessor, so it depends on that
+cell becoming a gap, which in turn depends on the card occupying it moving away.
+Cards caught in a cycle of such dependencies, or waiting on a locked or dead
+cell, can never move again until the next reshuffle.
+
+The analysis over-approximates everything that could still happen this phase: a
+least fixpoint of the cells each card might ever occupy and the cells that might
+ever be a gap. Cards that can reach no new cell are provably stuck, and a locked
+run can only grow over cells its next cards can reach, which gives a sound upper
+bound on the cards that can still be locked before the reshuffle.
+"""
+
+from typing import Dict, FrozenSet, List, NamedTuple, Set, Tuple, TYPE_CHECKING
+
+from src.simulator.cards import (
+    ROWS, COLS, GAP, NO_CARD, OFF_BOARD, CARD_PRED, CARD_RANK, ROW_START_MASK
+)
+
+if TYPE_CHECKING:
+    from src.simulator.game_state import GameState
+
+
+class DeadlockReport(NamedTuple):
+    """Result of analyze_phase"""
+    blockers: Dict[int, int]  # Unlocked card -> occupant of the cell it needs (GAP if free, NO_CARD if none)
+    movable: FrozenSet[int]  # Cards that might still move this phase
+    stuck: FrozenSet[int]  # Unlocked cards that provably cannot move until the next reshuffle
+    row_bounds: Tuple[int, ...]  # Upper bound on each row's locked run at the end of the phase
+    lock_bound: int  # Upper bound on total locked cards at the end of the phase
+
+
+def dependency_graph(state: 'GameState') -> Dict[int, int]:
+    """
+    Map every unlocked card (except 2s, which may use any column-0 cell) to the
+    occupant of the cell right of its predecessor.
+    """
+    cells = state.cells
+    loc = state.loc
+    locked_len = state.locked_len
+    graph = {}
+    for slot in range(len(cells)):
+        card = cells[slot]
+        if card == GAP or slot % COLS < locked_len[slot // COLS] or CARD_RANK[card] == 2:
+            continue
+        pred_slot = loc[CARD_PRED[card]]
+        if pred_slot == OFF_BOARD or pred_slot % COLS == COLS - 1:
+            graph[card] = NO_CARD
+        else:
+            graph[card] = cells[pred_slot + 1]
+    return graph
+
+
+def analyze_phase(state: 'GameState') -> DeadlockReport:
+    """Find provably stuck cards and bound the locks still reachable this phase"""
+    unlocked = _unlocked_cards(state)
+    reach, movable = _reach_fixpoint(state, unlocked)
+    row_bounds = _row_bounds(state, reach)
+    return DeadlockReport(
+        blockers=dependency_graph(state),
+        movable=frozenset(movable),
+        stuck=frozenset(card for card in unlocked if card not in movable),
+        row_bounds=row_bounds,
+        lock_bound=sum(row_bounds),
+    )
+
+
+def phase_lock_bound(state: 'GameState') -> int:
+    """
+    Upper bound on total locked cards at the end of the phase.
+
+    Same value as analyze_phase(state).lock_bound, without building the report.
+    """
+    reach, _ = _reach_fixpoint(state, _unlocked_cards(state))
+    return sum(_row_bounds(state, reach))
+
+
+def _unlocked_cards(state: 'GameState') -> List[int]:
+    """Codes of the cards on the board outside every locked run"""
+    cells = state.cells
+    locked_len = state.locked_len
+    return [
+        cells[slot] for slot in range(len(cells))
+        if cells[slot] != GAP and slot % COLS >= locked_len[slot // COLS]
+    ]
+
+
+def _reach_fixpoint(state: 'GameState', unlocked: List[int]) -> Tuple[List[int], Set[int]]:
+    """
+    Least fixpoint over slot bitmasks: reach[card] holds every cell the card might
+    occupy this phase, and may_gap every cell that might be a gap. A card might move
+    into a may-gap cell right of a cell its predecessor might occupy (a 2 into any
+    may-gap column-0 cell), and every cell it might occupy might later be a gap.
+
+    Returns:
+        Tuple of (reach indexed by card code, set of cards that might move)
+    """
+    loc = state.loc
+    may_gap = state.gap_mask
+    reach = [0] * len(loc)
+    for code in range(len(loc)):
+        if loc[code] != OFF_BOARD:
+            reach[code] = 1 << loc[code]
+    movable = set()
+    changed = True
+    while changed:
+        changed = False
+        for card in unlocked:
+            if CARD_RANK[card] == 2:
+                targets = may_gap & ROW_START_MASK
+            else:
+                targets = (reach[CARD_PRED[card]] << 1) & ~ROW_START_MASK & may_gap
+            if targets & ~reach[card]:
+                reach[card] |= targets
+                may_gap |= reach[card]
+                movable.add(card)
+                changed = True
+    return reach, movable
+
+
+def _row_bounds(state: 'GameState', reach: List[int]) -> Tuple[int, ...]:
+    """Upper bound on each row's locked run, given where cards might go"""
+    locked_len = state.locked_len
+    row_bounds = []
+    for row in range(ROWS):
+        length = locked_len[row]
+        if length == 0:
+            row_bounds.append(max(_run_extension(reach, row, suit, 0) for suit in range(4)))
+        else:
+            row_bounds.append(length + _run_extension(reach, row, state.locked_suit[row], length))
+    return tuple(row_bounds)
+
+
+def _run_extension(reach, row: int, suit: int, start: int) -> int:
+    """How far a row's run of suit could grow from column start, given where cards might go"""
+    base = row * COLS
+    col = start
+    while col < COLS - 1:
+        needed = suit * COLS + col + 1  # Rank col + 2
+        if not reach[needed] >> (base + col) & 1:
+            break
+        col += 1
+    return col - start
@@ -0,0 +1,245 @@
+"""
+Position evaluation from incrementally maintained features.
+
+Leaf evaluation runs far more often than anything else in search, so nothing here
+scans the board. GameState keeps its feature counters up to date by deltas on every
+apply_move and undo_move, and the evaluator only combines them with its weights.
+
+The features follow ProjectContext.TACTICAL_GOALS:
+    locked           Cards in locked 2..K runs (sequence building)
+    col0_gaps        Gaps in column 0, where 2s can be placed
+    king_traps       Gaps right of a King, unplayable until the next reshuffle
+    row_imbalance    Longest locked run minus shortest (row balance)
+    chained          Cards sitting directly right of their predecessor, locked or
+                     not (sequence length)
+    redeal_lockable  Expected runs that can grow by a card right after the next
+                     redeal, looked up in REDEAL_TABLE (reshuffle potential)
+
+Weights default to DEFAULT_WEIGHTS, overridden by a tuned weights file written by
+`python -m src.simulator.tuning` when one exists at WEIGHTS_PATH. Tuning output
+goes to data/ at the repository root, which git ignores, so tuning runs leave no
+artifacts in the source tree.
+
+upper_bound gives the admissible bound on final locked cards that branch-and-bound
+and futility pruning need to cut subtrees safely.
+"""
+
+import json
+import os
+from fractions import Fraction
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from src.simulator.cards import ROWS, COLS, NUM_SLOTS, MAX_LOCKED
+from src.simulator.deadlock import phase_lock_bound
+
+if TYPE_CHECKING:
+    from src.simulator.game_state import GameState
+
+FEATURE_NAMES = ("locked", "col0_gaps", "king_traps", "row_imbalance", "chained", "redeal_lockable")
+
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "locked": 1.0,
+    "col0_gaps": 0.5,
+    "king_traps": -0.5,
+    "row_imbalance": -0.1,
+    "chained": 0.25,
+    "redeal_lockable": 1.0,
+}
+
+# Generated datasets, weights and models live outside the source tree, in data/ at the repository root
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data")
+WEIGHTS_PATH = os.path.join(DATA_DIR, "evaluator_weights.json")
+
+GAPS = 4  # Every redeal puts the 4 gaps back among the unlocked cells
+
+
+def _redeal_expectation(unlocked: int, unstarted: int, complete: int) -> Tuple[float, float]:
+    """
+    Exact expectations right after a uniform redeal of the unlocked cells.
+
+    The unlocked - 4 cards and 4 gaps are spread uniformly over the unlocked cells.
+    Every row has one cell where its run continues: column 0 of an unstarted row,
+    the cell after the run of a started row, and the dead cell right of the King of
+    a complete row. Every other unlocked cell's left neighbour is itself a uniform
+    draw from the remaining cards and gaps, and is playable unless it is a gap or
+    one of the 4 - complete unlocked Kings.
+
+    Returns:
+        Tuple of (expected legal moves, expected rows whose run can grow by a card,
+        either because the next card landed in place or because a gap landed there
+        and has a filler)
+    """
+    started = ROWS - unstarted - complete
+    cells = Fraction(unlocked)
+    others = unlocked - ROWS
+    # A gap in column 0 takes any of the unstarted 2s not dealt into another column-0 cell
+    twos_free = unstarted * (1 - Fraction(unstarted - 1, unlocked - 1))
+    playable_left = Fraction(unlocked - GAPS - (ROWS - complete), unlocked - 1) if others else 0
+    moves = GAPS / cells * (started + unstarted * twos_free + others * playable_left)
+    # A started row grows if a gap (its filler is always unlocked) or its next card lands
+    # in the continuation cell. An unstarted row grows if a gap lands in column 0, since
+    # n unstarted 2s cannot all sit in the other n - 1 column-0 cells, or if a 2 does
+    lockable = started * (GAPS + 1) / cells + unstarted * (GAPS + unstarted) / cells
+    return float(moves), float(lockable)
+
+
+# REDEAL_TABLE[unlocked cells][unstarted rows][complete rows] -> (expected moves,
+# expected growable rows). The 4 gaps are always redealt, so the gap count needs no
+# axis; instead the rows split by how their continuation cell behaves.
+REDEAL_TABLE: List[List[List[Tuple[float, float]]]] = [
+    [
+        [
+            _redeal_expectation(unlocked, unstarted, complete)
+            if unlocked >= NUM_SLOTS - MAX_LOCKED and unstarted + complete <= ROWS else (0.0, 0.0)
+            for complete in range(ROWS + 1)
+        ]
+        for unstarted in range(ROWS + 1)
+    ]
+    for unlocked in range(NUM_SLOTS + 1)
+]
+
+
+def redeal_expectation(state: 'GameState') -> Tuple[float, float]:
+    """
+    Expected (legal moves, growable rows) right after redealing this position's
+    unlocked cards, by table lookup on its locked configuration.
+    """
+    locked_len = state.locked_len
+    unlocked = NUM_SLOTS - (locked_len[0] + locked_len[1] + locked_len[2] + locked_len[3])
+    return REDEAL_TABLE[unlocked][locked_len.count(0)][locked_len.count(COLS - 1)]
+
+
+def features(state: 'GameState') -> Tuple[float, ...]:
+    """Feature vector of a position in FEATURE_NAMES order, in O(1)"""
+    locked_len = state.locked_len
+    locked = locked_len[0] + locked_len[1] + locked_len[2] + locked_len[3]
+    longest = max(locked_len)
+    shortest = min(locked_len)
+    return (
+        locked,
+        state.col0_gaps,
+        state.king_traps,
+        longest - shortest,
+        state.chained,
+        REDEAL_TABLE[NUM_SLOTS - locked][locked_len.count(0)][locked_len.count(COLS - 1)][1],
+    )
+
+
+def upper_bound(state: 'GameState', reshuffles_remaining: int) -> int:
+    """
+    Admissible upper bound on the locked cards at the end of the game.
+
+    Locked runs survive reshuffles, so the current locks are a floor. In the last
+    phase the deadlock analysis bounds how far each run can still grow; with a
+    reshuffle left, a redeal can put any card anywhere, so nothing beyond the
+    full board can be ruled out.
+    """
+    if reshuffles_remaining > 0:
+        return MAX_LOCKED
+    if state.is_stuck():
+        return state.locked_count()
+    return phase_lock_bound(state)
+
+
+def can_improve(state: 'GameState', reshuffles_remaining: int, incumbent: int) -> bool:
+    """Whether the subtree below state could still end with more locked cards than incumbent"""
+    return upper_bound(state, reshuffles_remaining) > incumbent
+
+
+def load_weights(path: str = WEIGHTS_PATH) -> Dict[str, float]:
+    """
+    Read tuned weights from a file written by the tuning command.
+
+    Returns:
+        Dict of feature name to weight, empty if the file does not exist
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return {name: float(weight) for name, weight in json.load(f)["weights"].items()}
+
+
+def save_weights(weights: Dict[str, float], path: str = WEIGHTS_PATH, **metadata):
+    """Write weights in the format load_weights reads, plus any metadata about the fit"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"weights": weights, **metadata}, f, indent=2)
+
+
+def load_evaluator(kind: str = "handcrafted", model_path: Optional[str] = None):
+    """
+    The leaf evaluator a search should use.
+
+    Args:
+        kind: "handcrafted" for the linear Evaluator, "network" for the learned
+            ValueNet (requires NumPy and a trained model file)
+        model_path: Model file for "network", defaulting to value_net.MODEL_PATH
+
+    Returns:
+        An object with evaluate(state) and evaluate_batch(boards)
+
+    Raises:
+        ValueError: If kind is unknown
+    """
+    if kind == "handcrafted":
+        return Evaluator()
+    if kind == "network":
+        from src.simulator.value_net import MODEL_PATH, ValueNet
+        return ValueNet.load(model_path or MODEL_PATH)
+    raise ValueError(f"Unknown evaluator kind: {kind!r}")
+
+
+# Loaded once at startup; Evaluator() uses these over the defaults
+TUNED_WEIGHTS: Dict[str, float] = load_weights()
+
+
+class Evaluator:
+    """
+    Linear evaluation over the incrementally maintained features.
+
+    Weights start from DEFAULT_WEIGHTS updated with TUNED_WEIGHTS, then with any
+    weights passed in.
+
+    Scores are cached on the state until the next move, and the cached value is
+    restored by undo_move, so re-evaluating a position on the way back up a search
+    is free.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        merged = dict(DEFAULT_WEIGHTS)
+        for overrides in (TUNED_WEIGHTS, weights or {}):
+            unknown = set(overrides) - set(FEATURE_NAMES)
+            if unknown:
+                raise ValueError(f"Unknown features: {', '.join(sorted(unknown))}")
+            merged.update(overrides)
+        self.weights: Tuple[float, ...] = tuple(float(merged[name]) for name in FEATURE_NAMES)
+
+    def evaluate(self, state: 'GameState') -> float:
+        """Score of a position; higher is better"""
+        cached = state._evaluation_cache
+        if cached is not None and cached[0] is self:
+            return cached[1]
+        score = self.score(features(state))
+        state._evaluation_cache = (self, score)
+        return score
+
+    def evaluate_batch(self, boards):
+        """Scores of an (N, 52) int8 array of boards; see batch.evaluate_batch (requires NumPy)"""
+        from src.simulator.batch import evaluate_batch
+        return evaluate_batch(boards, self)
+
+    def score(self, values: Tuple[float, ...]) -> float:
+        """
+        Weighted sum of a feature vector.
+
+        Terms are added one at a time in FEATURE_NAMES order, so a vectorized
+        evaluation summing in the same order reproduces scores exactly.
+        """
+        total = 0.0
+        for value, weight in zip(values, self.weights):
+            total += value * weight
+        return total
+
+    def weight_dict(self) -> Dict[str, float]:
+        """Weights keyed by feature name"""
+        return dict(zip(FEATURE_NAMES, self.weights))
@@ -5,14 +5,24 @@ This module provides optimized data structures for representing game positions,
 following performance-first principles with target of 50,000+ positions/second.
 """
 
-from typing import List, Tuple, Optional, Set
+from typing import Dict, List, Tuple, Optional, Set
 from dataclasses import dataclass
+from array import array
+import random
 import sys
 import os
 
-# Add parent directory to path for context import
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from context import ProjectContext
+# Add the repository root to the path, so the src package imports also work when
+# this file is run directly for its design check
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from src.context import ProjectContext
+from src.simulator.cards import (
+    ROWS, COLS, NUM_SLOTS, GAP, NO_CARD, OFF_BOARD, DECK, CARD_RANK, CARD_SUIT, CARD_SUCC,
+    CARD_NAME, NAME_TO_CODE, FULL_DECK_MASK, ROW_START_SLOTS, IS_ROW_START, ALL_SLOTS_MASK,
+    ROW_START_MASK, MOVE_SHIFT, MOVE_MASK, encode_card
+)
+from src.simulator.move_gen import filler_src, moves_into
+from src.simulator.symmetry import Transform, canonical_key
 
 
 @dataclass(frozen=True)
@@ -29,24 +39,84 @@ class CardPosition:
             raise ValueError(f"Invalid suit: {self.suit}. Must be 0-3")
 
 
+# Interned boundary objects, one per card code (see cards.py for the encoding)
+_CARD_OBJECTS: List[Optional[CardPosition]] = [None] * NUM_SLOTS
+for _code in DECK:
+    _CARD_OBJECTS[_code] = CardPosition(CARD_RANK[_code], CARD_SUIT[_code])
+
+
+# Zobrist keys, one 64-bit value per (slot, card code); fixed seed keeps keys reproducible
+ZOBRIST_SEED = 0x6A9B_EA7E
+_zobrist_rng = random.Random(ZOBRIST_SEED)
+ZOBRIST_KEYS: List[int] = [_zobrist_rng.getrandbits(64) for _ in range(NUM_SLOTS * NUM_SLOTS)]
+del _zobrist_rng
+
+
+# Cells whose gap status, dead-gap status or left pairing can change when a card
+# moves between src and dst: both cells and the cells right of them, deduplicated
+NEIGHBOURHOOD: List[List[Tuple[int, ...]]] = [
+    [
+        tuple(sorted({src, dst} | {slot + 1 for slot in (src, dst) if slot % COLS != COLS - 1}))
+        for dst in range(NUM_SLOTS)
+    ]
+    for src in range(NUM_SLOTS)
+]
+
+
+def _check_complete(seen: int):
+    """Raise ValueError unless the bitmask of cards seen on a board is the whole deck"""
+    if seen != FULL_DECK_MASK:
+        missing = [CARD_NAME[code] for code in DECK if not seen >> code & 1]
+        raise ValueError(f"Incomplete deal, missing cards: {', '.join(missing)}")
+
+
+def card_code(card: CardPosition) -> int:
+    """Encode a validated CardPosition as its 0-51 card code"""
+    return encode_card(card.rank, card.suit)
+
+
+def card_from_code(code: int) -> CardPosition:
+    """Interned CardPosition for a card code"""
+    return _CARD_OBJECTS[code]
+
+
 class GameState:
     """
     Efficient board representation optimized for search algorithms.
     
     Follows SOLID principles with single responsibility for game state management.
     Designed for performance-first approach targeting millions of evaluations per second.
+    
+    The board is a single 52-slot signed byte buffer of card codes with GAP marking
+    empty slots; row and column are derived from the slot index (slot = row * 13 + col).
     """
     
     def __init__(self):
         """Initialize empty game state following project architecture principles"""
-        # 4 rows x 13 positions, None represents gaps
-        self.board: List[List[Optional[CardPosition]]] = [[None for _ in range(13)] for _ in range(4)]
-        self.gaps: Set[Tuple[int, int]] = set()  # Track gap positions for O(1) lookup
-        self.immutable_sequences: Set[Tuple[int, int]] = set()  # Cards that cannot be moved
+        # 4 rows x 13 positions flattened, every slot starts out as a gap
+        self.cells = array('b', [GAP]) * NUM_SLOTS
+        self.gaps: Set[int] = set(range(NUM_SLOTS))  # Gap slots for O(1) lookup
+        # The same gap slots in a flat array, so move generation can walk them by index
+        # without creating an iterator
+        self.gap_slots = array('b', range(NUM_SLOTS))
+        # Slot bitmasks of all gaps and of dead gaps (right of a King or of another gap)
+        self.gap_mask = ALL_SLOTS_MASK
+        self.dead_gaps = ALL_SLOTS_MASK & ~ROW_START_MASK
+        self.king_trap_mask = 0  # Gaps right of a King
+        # Evaluation feature counters, updated by deltas on every mutation
+        self.col0_gaps = ROWS  # Gaps in column 0
+        self.king_traps = 0  # Gaps right of a King
+        self.chained = 0  # Cards sitting directly right of their predecessor
+        self.loc = array('b', [OFF_BOARD]) * NUM_SLOTS  # Card code -> slot inverse index
+        self.zobrist = 0  # XOR of ZOBRIST_KEYS for every placed card; gaps contribute nothing
+        # Locked run per row: its length (cells 0..len-1 hold 2..len+1) and suit, -1 if none
+        self.locked_len: List[int] = [0] * ROWS
+        self.locked_suit: List[int] = [-1] * ROWS
         
         # Performance optimization: pre-allocate commonly used data structures
-        self._legal_moves_cache: Optional[List[Tuple[CardPosition, Tuple[int, int]]]] = None
-        self._evaluation_cache: Optional[float] = None
+        self._gap_moves: Optional[Dict[int, Tuple[int, ...]]] = None  # Gap slot -> moves into it
+        self._legal_moves_cache: Optional[List[int]] = None
+        self._evaluation_cache: Optional[Tuple[object, float]] = None  # (evaluator, score)
     
     def is_valid_position(self, row: int, col: int) -> bool:
         """Validate board position coordinates"""
@@ -61,12 +131,37 @@ class GameState:
         """
         if not self.is_valid_position(row, col):
             return False
-        
-        if (row, col) in self.immutable_sequences:
-            return False  # Cannot place on immutable position
             
-        self.board[row][col] = card
-        self.gaps.discard((row, col))  # Remove from gaps if it was one
+        return self.place_code(card_code(card), row * COLS + col)
+    
+    def place_code(self, code: int, slot: int) -> bool:
+        """Place a card code at a slot; int counterpart of place_card used on the hot path"""
+        row = slot // COLS
+        col = slot - row * COLS
+        if col < self.locked_len[row]:
+            return False  # Cannot place on immutable position
+        if self.loc[code] not in (OFF_BOARD, slot):
+            return False  # Card is already on the board elsewhere
+        neighbourhood = NEIGHBOURHOOD[slot][slot]
+        self.chained -= self._pairs_in(neighbourhood)
+        old = self.cells[slot]
+        if old != GAP:
+            self.zobrist ^= ZOBRIST_KEYS[slot * NUM_SLOTS + old]
+            self.loc[old] = OFF_BOARD
+        elif col == 0:
+            self.col0_gaps -= 1
+        self.zobrist ^= ZOBRIST_KEYS[slot * NUM_SLOTS + code]
+        self.cells[slot] = code
+        self.loc[code] = slot
+        if old == GAP:
+            self.gaps.remove(slot)
+            self.gap_slots.remove(slot)
+        self.gap_mask &= ~(1 << slot)
+        self.chained += self._pairs_in(neighbourhood)
+        for touched in neighbourhood:
+            self._recheck_dead(touched)
+        if col == self.locked_len[row]:
+            self._extend_lock(row)
         self._invalidate_caches()
         return True
     
@@ -75,11 +170,26 @@ class GameState:
         if not self.is_valid_position(row, col):
             return False
             
-        if (row, col) in self.immutable_sequences:
+        if col < self.locked_len[row]:
             return False  # Cannot create gap in immutable sequence
             
-        self.board[row][col] = None
-        self.gaps.add((row, col))
+        slot = row * COLS + col
+        neighbourhood = NEIGHBOURHOOD[slot][slot]
+        self.chained -= self._pairs_in(neighbourhood)
+        old = self.cells[slot]
+        if old != GAP:
+            self.zobrist ^= ZOBRIST_KEYS[slot * NUM_SLOTS + old]
+            self.loc[old] = OFF_BOARD
+            if col == 0:
+                self.col0_gaps += 1
+        if old != GAP:
+            self.gaps.add(slot)
+            self.gap_slots.append(slot)
+        self.cells[slot] = GAP
+        self.gap_mask |= 1 << slot
+        self.chained += self._pairs_in(neighbourhood)
+        for touched in neighbourhood:
+            self._recheck_dead(touched)
         self._invalidate_caches()
         return True
     
@@ -87,10 +197,230 @@ class GameState:
         """Get card at specified position"""
         if not self.is_valid_position(row, col):
             return None
-        return self.board[row][col]
+        code = self.cells[row * COLS + col]
+        return None if code == GAP else _CARD_OBJECTS[code]
+    
+    def get_code(self, slot: int) -> int:
+        """Card code at a slot, or GAP"""
+        return self.cells[slot]
+    
+    def card_slot(self, code: int) -> int:
+        """Slot currently holding the card code, or OFF_BOARD"""
+        return self.loc[code]
+    
+    def filler_slot(self, gap: int) -> int:
+        """
+        Slot of the only card that may fill a gap outside column 0.
+        
+        Returns OFF_BOARD for column-0 gaps and for gaps right of a gap or a King.
+        """
+        if gap % COLS == 0:
+            return OFF_BOARD
+        return filler_src(self.cells, self.loc, gap)
+    
+    def apply_move(self, move: int) -> tuple:
+        """
+        Move the card at the move's source slot into its target gap, in place.
+        
+        The move is assumed legal. If the card extends its row's locked run, the run
+        grows over it and over any correctly placed cards already waiting behind it.
+        
+        Returns:
+            tuple: Undo token to pass to undo_move
+        """
+        src = move >> MOVE_SHIFT
+        dst = move & MOVE_MASK
+        cells = self.cells
+        card = cells[src]
+        neighbourhood = NEIGHBOURHOOD[src][dst]
+        self.chained -= self._pairs_in(neighbourhood)
+        self.zobrist ^= ZOBRIST_KEYS[src * NUM_SLOTS + card] ^ ZOBRIST_KEYS[dst * NUM_SLOTS + card]
+        cells[src] = GAP
+        cells[dst] = card
+        self.loc[card] = dst
+        self.gaps.remove(dst)
+        self.gaps.add(src)
+        gap_slots = self.gap_slots
+        gap_slots[gap_slots.index(dst)] = src
+        self._gaps_moved(src, dst, neighbourhood)
+        
+        row = dst // COLS
+        prev_locked = self.locked_len[row]
+        if dst - row * COLS == prev_locked:
+            self._extend_lock(row)
+        
+        token = (move, prev_locked, self._legal_moves_cache, self._evaluation_cache)
+        if self._gap_moves is not None:
+            self._refresh_around(src, dst, card)
+        self._legal_moves_cache = None
+        self._evaluation_cache = None
+        return token
+    
+    def undo_move(self, token: tuple):
+        """Restore the exact state from before the apply_move that produced token"""
+        move, prev_locked, legal_moves, evaluation = token
+        src = move >> MOVE_SHIFT
+        dst = move & MOVE_MASK
+        cells = self.cells
+        card = cells[dst]
+        neighbourhood = NEIGHBOURHOOD[src][dst]
+        self.chained -= self._pairs_in(neighbourhood)
+        self.zobrist ^= ZOBRIST_KEYS[src * NUM_SLOTS + card] ^ ZOBRIST_KEYS[dst * NUM_SLOTS + card]
+        cells[dst] = GAP
+        cells[src] = card
+        self.loc[card] = src
+        self.gaps.remove(src)
+        self.gaps.add(dst)
+        gap_slots = self.gap_slots
+        gap_slots[gap_slots.index(src)] = dst
+        self._gaps_moved(src, dst, neighbourhood)
+        row = dst // COLS
+        self.locked_len[row] = prev_locked
+        if prev_locked == 0:
+            self.locked_suit[row] = -1
+        if self._gap_moves is not None:
+            self._refresh_around(src, dst, card)
+        self._legal_moves_cache = legal_moves
+        self._evaluation_cache = evaluation
+    
+    def is_stuck(self) -> bool:
+        """
+        Whether every gap is dead, in O(1).
+        
+        On a complete deal a live gap always has a filler, so this is exactly the
+        no-legal-moves test that ends a phase.
+        """
+        return self.dead_gaps == self.gap_mask
+    
+    def _gaps_moved(self, src: int, dst: int, neighbourhood: Tuple[int, ...]):
+        """Update gap masks and counters after a card moved between src and dst (either direction)"""
+        self.gap_mask ^= (1 << src) | (1 << dst)
+        self.chained += self._pairs_in(neighbourhood)
+        cells = self.cells
+        if IS_ROW_START[src]:
+            self.col0_gaps += 1 if cells[src] == GAP else -1
+        if IS_ROW_START[dst]:
+            self.col0_gaps += 1 if cells[dst] == GAP else -1
+        recheck = self._recheck_dead
+        for slot in neighbourhood:
+            recheck(slot)
+    
+    def _pairs_in(self, slots: Tuple[int, ...]) -> int:
+        """How many of the slots hold the successor of their left neighbour"""
+        cells = self.cells
+        pairs = 0
+        for slot in slots:
+            # Ace codes never appear, so +1 only matches a same-suit successor
+            if not IS_ROW_START[slot] and cells[slot] == cells[slot - 1] + 1:
+                pairs += 1
+        return pairs
+    
+    def _recheck_dead(self, slot: int):
+        """Refresh one slot's bits in dead_gaps and king_trap_mask"""
+        cells = self.cells
+        bit = 1 << slot
+        if cells[slot] == GAP and not IS_ROW_START[slot] and CARD_SUCC[cells[slot - 1]] == NO_CARD:
+            self.dead_gaps |= bit
+            if CARD_RANK[cells[slot - 1]] == 13:
+                if not self.king_trap_mask & bit:
+                    self.king_trap_mask |= bit
+                    self.king_traps += 1
+                return
+        else:
+            self.dead_gaps &= ~bit
+        if self.king_trap_mask & bit:
+            self.king_trap_mask &= ~bit
+            self.king_traps -= 1
+    
+    def _rebuild_dead(self):
+        """Recompute the gap array, gap masks and feature counters from the gap set and cells"""
+        self.gap_mask = 0
+        self.dead_gaps = 0
+        self.king_trap_mask = 0
+        self.king_traps = 0
+        self.col0_gaps = 0
+        for gap in self.gaps:
+            self.gap_mask |= 1 << gap
+            self._recheck_dead(gap)
+            if IS_ROW_START[gap]:
+                self.col0_gaps += 1
+        self.chained = self._pairs_in(range(NUM_SLOTS))
+        self.gap_slots = array('b', sorted(self.gaps))
+    
+    def legal_moves(self) -> List[int]:
+        """
+        All legal moves as packed ints.
+        
+        Per-gap move lists are kept up to date by apply_move/undo_move, so repeated
+        queries between mutations return the same cached list.
+        """
+        moves = self._legal_moves_cache
+        if moves is None:
+            gap_moves = self._gap_moves
+            if gap_moves is None:
+                gap_moves = self._gap_moves = {
+                    gap: moves_into(self.cells, self.loc, gap) for gap in self.gaps
+                }
+            moves = []
+            for entry in gap_moves.values():
+                moves.extend(entry)
+            self._legal_moves_cache = moves
+        return moves
+    
+    def _refresh_gap(self, slot: int):
+        """Recompute the cached move entry of one slot after its surroundings changed"""
+        if self.cells[slot] == GAP:
+            self._gap_moves[slot] = moves_into(self.cells, self.loc, slot)
+        else:
+            self._gap_moves.pop(slot, None)
+    
+    def _refresh_around(self, src: int, dst: int, card: int):
+        """
+        Update cached move entries after card moved between src and dst (either direction).
+        
+        Only the two cells themselves and the cells right of them can change, plus the
+        column-0 gaps when the card is a 2.
+        """
+        refresh = self._refresh_gap
+        refresh(src)
+        refresh(dst)
+        if src % COLS != COLS - 1:
+            refresh(src + 1)
+        if dst % COLS != COLS - 1:
+            refresh(dst + 1)
+        if CARD_RANK[card] == 2:
+            for slot in ROW_START_SLOTS:
+                refresh(slot)
+    
+    def is_locked(self, row: int, col: int) -> bool:
+        """Whether the cell belongs to its row's locked 2..K run"""
+        return col < self.locked_len[row]
+    
+    def locked_count(self) -> int:
+        """Total number of locked cards on the board"""
+        locked_len = self.locked_len
+        return locked_len[0] + locked_len[1] + locked_len[2] + locked_len[3]
+    
+    def _extend_lock(self, row: int):
+        """Grow the row's locked run over every correctly placed card that now follows it"""
+        cells = self.cells
+        base = row * COLS
+        length = self.locked_len[row]
+        if length == 0:
+            code = cells[base]
+            if CARD_RANK[code] != 2:  # Only a 2 can start a run
+                return
+            self.locked_suit[row] = CARD_SUIT[code]
+            length = 1
+        expected = self.locked_suit[row] * COLS + length + 1  # Code of rank length + 2
+        while length < COLS - 1 and cells[base + length] == expected:
+            length += 1
+            expected += 1
+        self.locked_len[row] = length
     
     def _invalidate_caches(self):
         """Invalidate performance caches when board state changes"""
+        self._gap_moves = None
         self._legal_moves_cache = None
         self._evaluation_cache = None
     
@@ -98,44 +428,209 @@ class GameState:
         """
         Create deep copy of game state for search algorithms.
         
-        Optimized for performance as this will be called frequently during tree search.
+        Depth-first search should prefer apply_move/undo_move on a single state; copies
+        are for splitting work at the root.
         """
-        new_state = GameState()
+        new_state = GameState.__new__(GameState)
         
-        # Deep copy board
-        for row in range(4):
-            for col in range(13):
-                new_state.board[row][col] = self.board[row][col]
+        # Single buffer copy instead of a per-cell loop
+        new_state.cells = self.cells[:]
+        new_state.zobrist = self.zobrist
+        new_state.loc = self.loc[:]
         
         # Copy sets
         new_state.gaps = self.gaps.copy()
-        new_state.immutable_sequences = self.immutable_sequences.copy()
+        new_state.gap_slots = self.gap_slots[:]
+        new_state.gap_mask = self.gap_mask
+        new_state.dead_gaps = self.dead_gaps
+        new_state.king_trap_mask = self.king_trap_mask
+        new_state.col0_gaps = self.col0_gaps
+        new_state.king_traps = self.king_traps
+        new_state.chained = self.chained
+        new_state.locked_len = self.locked_len[:]
+        new_state.locked_suit = self.locked_suit[:]
+        new_state._gap_moves = None if self._gap_moves is None else self._gap_moves.copy()
+        new_state._legal_moves_cache = None
+        new_state._evaluation_cache = None
         
         return new_state
     
+    def to_key(self) -> bytes:
+        """
+        Compact immutable position key: the 52 card-code bytes, gaps stored as 0xFF.
+        
+        Locked runs and gaps are derived from the cells, so equal keys mean equal
+        positions and key comparison is a single memcmp.
+        """
+        return self.cells.tobytes()
+    
+    @classmethod
+    def from_key(cls, key: bytes, validate: bool = True) -> 'GameState':
+        """
+        Rebuild a GameState from a key produced by to_key.
+        
+        Keys read back from an on-disk cache are untrusted, so by default the key
+        must hold exactly the 48-card deck plus 4 gaps. Pass validate=False only for
+        keys built in-process, e.g. benchmark boards with extra gaps.
+        
+        Raises:
+            ValueError: If the key has the wrong length, or fails validation
+        """
+        if len(key) != NUM_SLOTS:
+            raise ValueError(f"Invalid position key length: {len(key)}. Must be {NUM_SLOTS}")
+        state = cls()
+        state.cells = array('b', key)
+        if validate:
+            seen = 0
+            for slot in range(NUM_SLOTS):
+                code = state.cells[slot]
+                if code == GAP:
+                    continue
+                row, col = divmod(slot, COLS)
+                if not 0 <= code < NUM_SLOTS or not FULL_DECK_MASK >> code & 1:
+                    raise ValueError(f"Invalid card byte {key[slot]:#04x} at row {row + 1}, col {col + 1}")
+                if seen >> code & 1:
+                    raise ValueError(f"Duplicate card {CARD_NAME[code]} at row {row + 1}, col {col + 1}")
+                seen |= 1 << code
+            _check_complete(seen)
+        state._rebuild_derived()
+        return state
+    
+    @classmethod
+    def from_flat(cls, flat_board: List[str]) -> 'GameState':
+        """
+        Build a GameState from the flat 52-string board used by GameManager and saves.
+        
+        Accepts normalized names ("4C", "--") as well as the raw lowercase and gap
+        spellings CardValidator accepts. Gaps, the location index, the Zobrist key and
+        locked runs are all derived in one pass.
+        
+        Raises:
+            ValueError: If the board is not exactly the 48-card deck plus 4 gaps
+        """
+        if len(flat_board) != NUM_SLOTS:
+            raise ValueError(f"Invalid board length: {len(flat_board)}. Must be {NUM_SLOTS}")
+        
+        state = cls()
+        cells = state.cells
+        loc = state.loc
+        gaps = set()
+        zobrist = 0
+        seen = 0
+        for row in range(ROWS):
+            base = row * COLS
+            run_open = True  # Still extending this row's locked run
+            suit_base = 0
+            for col in range(COLS):
+                slot = base + col
+                code = NAME_TO_CODE.get(flat_board[slot])
+                if code is None:
+                    raise ValueError(f"Invalid card {flat_board[slot]!r} at row {row + 1}, col {col + 1}")
+                cells[slot] = code
+                if code == GAP:
+                    gaps.add(slot)
+                    run_open = False
+                    continue
+                bit = 1 << code
+                if seen & bit:
+                    raise ValueError(f"Duplicate card {CARD_NAME[code]} at row {row + 1}, col {col + 1}")
+                seen |= bit
+                loc[code] = slot
+                zobrist ^= ZOBRIST_KEYS[slot * NUM_SLOTS + code]
+                if run_open:
+                    if col == 0 and CARD_RANK[code] == 2:
+                        suit_base = code - 1
+                        state.locked_suit[row] = CARD_SUIT[code]
+                        state.locked_len[row] = 1
+                    elif col > 0 and code == suit_base + col + 1:
+                        state.locked_len[row] = col + 1
+                    else:
+                        run_open = False
+        
+        _check_complete(seen)
+        state.gaps = gaps
+        state.zobrist = zobrist
+        state._rebuild_dead()
+        return state
+    
+    @staticmethod
+    def locked_lengths(flat_board: List[str]) -> List[int]:
+        """
+        Locked run length of each row of a flat 52-string board, without validating it.
+        
+        Reads only each row's leading 2..K run, so a board with a mistyped or missing
+        card elsewhere still yields the runs that survive a reshuffle.
+        """
+        lengths = [0] * ROWS
+        for row in range(min(ROWS, len(flat_board) // COLS)):
+            base = row * COLS
+            first = NAME_TO_CODE.get(flat_board[base], GAP)
+            if CARD_RANK[first] != 2:
+                continue
+            length = 1
+            while length < COLS - 1 and NAME_TO_CODE.get(flat_board[base + length]) == first + length:
+                length += 1
+            lengths[row] = length
+        return lengths
+    
+    def to_flat(self) -> List[str]:
+        """Flat 52-string board in GameManager's normalized format ("4C", "--")"""
+        return [CARD_NAME[code] for code in self.cells]
+    
+    def canonicalize(self) -> Tuple[bytes, Transform]:
+        """
+        Canonical key of this position under row-swap x suit-relabel symmetry.
+        
+        Returns:
+            Tuple of the canonical key and the transform mapping this position onto it;
+            use symmetry.untransform_move to map moves found there back to this board
+        """
+        return canonical_key(self.to_key())
+    
+    def _rebuild_derived(self):
+        """Recompute gaps, location index, Zobrist key and locked runs from cells"""
+        cells = self.cells
+        loc = array('b', [OFF_BOARD]) * NUM_SLOTS
+        gaps = set()
+        zobrist = 0
+        for slot in range(NUM_SLOTS):
+            code = cells[slot]
+            if code == GAP:
+                gaps.add(slot)
+            else:
+                loc[code] = slot
+                zobrist ^= ZOBRIST_KEYS[slot * NUM_SLOTS + code]
+        self.loc = loc
+        self.gaps = gaps
+        self.zobrist = zobrist
+        self._rebuild_dead()
+        self.locked_len = [0] * ROWS
+        self.locked_suit = [-1] * ROWS
+        for row in range(ROWS):
+            self._extend_lock(row)
+        self._invalidate_caches()
+    
     def __hash__(self) -> int:
         """
         Hash function for transposition tables.
         
-        Implements Zobrist hashing concept from chess engines for efficient position caching.
+        Returns the incrementally maintained 64-bit Zobrist key, so lookups cost O(1).
         """
-        # Simple hash implementation - can be optimized with Zobrist hashing later
-        board_tuple = tuple(
-            tuple(
-                (card.rank, card.suit) if card else None 
-                for card in row
-            ) 
-            for row in self.board
-        )
-        return hash((board_tuple, tuple(sorted(self.gaps))))
+        return self.zobrist
     
     def __eq__(self, other) -> bool:
         """Equality comparison for transposition tables"""
         if not isinstance(other, GameState):
             return False
-        return (self.board == other.board and 
-                self.gaps == other.gaps and 
-                self.immutable_sequences == other.immutable_sequences)
+        # Gaps and locked runs are derived from cells, so the buffer comparison covers them
+        return self.zobrist == other.zobrist and self.cells == other.cells
+
+
+def deal(rng: random.Random) -> GameState:
+    """A uniformly random opening deal: the 48 cards and 4 gaps shuffled over the board"""
+    cells = list(DECK) + [GAP] * 4
+    rng.shuffle(cells)
+    return GameState.from_key(bytes(code & 0xFF for code in cells))
 
 
 def validate_game_state_design():
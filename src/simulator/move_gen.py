@@ -0,0 +1,294 @@
+"""
+Table-driven legal move generation for Gaps Solitaire.
+
+Move generation is the innermost loop of every search engine, so it works directly
+on the flat card-code buffer and card-location index of a GameState and never scans
+the board: each gap costs one successor-table lookup plus one location lookup, or
+four location lookups for a column-0 gap.
+
+Moves are packed ints, src << 6 | dst. The moving card is whatever occupies src,
+which keeps every move code within 16 bits.
+"""
+
+from array import array
+from typing import List, Tuple, TYPE_CHECKING
+
+from src.simulator.cards import (
+    ROWS, COLS, NUM_SLOTS, NO_CARD, OFF_BOARD, DECK, TWOS, CARD_SUCC, CARD_NAME, IS_ROW_START,
+    MOVE_SHIFT, MOVE_MASK
+)
+
+if TYPE_CHECKING:
+    from src.simulator.game_state import GameState
+
+# Four column-0 gaps can each take any of four movable 2s; otherwise a gap has at most one filler
+MAX_MOVES = 16
+# Any board, including ones built with extra gaps: each card other than a 2 can only fill
+# the cell right of its predecessor, and each 2 only the four column-0 cells
+MAX_BOARD_MOVES = len(DECK) - len(TWOS) + len(TWOS) * ROWS
+
+
+# Every move code as a prebuilt int, indexed [src][dst], so filling a buffer never
+# creates int objects
+MOVE_CODES: List[List[int]] = [
+    [(src << MOVE_SHIFT) | dst for dst in range(NUM_SLOTS)] for src in range(NUM_SLOTS)
+]
+
+
+def filler_src(cells, loc, gap: int) -> int:
+    """
+    Slot of the only card that may fill a gap outside column 0: the successor of its
+    left neighbour. OFF_BOARD if the gap is dead, i.e. right of a King or of another
+    gap, which the GAP entry of the successor table handles without a branch.
+    """
+    successor = CARD_SUCC[cells[gap - 1]]
+    if successor == NO_CARD:
+        return OFF_BOARD
+    return loc[successor]
+
+
+def two_src(loc, two: int) -> int:
+    """Slot of a 2 free to move into a column-0 gap, or OFF_BOARD if it is off the board or in column 0"""
+    src = loc[two]
+    if src == OFF_BOARD or IS_ROW_START[src]:
+        return OFF_BOARD
+    return src
+
+
+def moves_into(cells, loc, gap: int) -> Tuple[int, ...]:
+    """
+    Legal moves filling one gap.
+
+    A column-0 gap takes any 2 not already locked in column 0. Any other gap takes
+    only the successor of its left neighbour.
+    """
+    if IS_ROW_START[gap]:
+        return tuple(
+            MOVE_CODES[src][gap] for src in (two_src(loc, two) for two in TWOS) if src != OFF_BOARD
+        )
+    src = filler_src(cells, loc, gap)
+    return () if src == OFF_BOARD else (MOVE_CODES[src][gap],)
+
+
+def generate_moves(state: 'GameState') -> List[int]:
+    """
+    Generate all legal moves of a position from scratch in O(number of gaps).
+
+    Unlike GameState.legal_moves this does not consult or fill any cache.
+    """
+    cells = state.cells
+    loc = state.loc
+    moves = []
+    for gap in state.gap_slots:
+        if IS_ROW_START[gap]:
+            for two in TWOS:
+                src = two_src(loc, two)
+                if src != OFF_BOARD:
+                    moves.append(MOVE_CODES[src][gap])
+        else:
+            src = filler_src(cells, loc, gap)
+            if src != OFF_BOARD:
+                moves.append(MOVE_CODES[src][gap])
+    return moves
+
+
+def generate_into(state: 'GameState', buffer: array) -> int:
+    """
+    Write a position's legal moves to the front of buffer, without allocating.
+
+    The buffer needs MAX_MOVES entries for a deal with 4 gaps and MAX_BOARD_MOVES
+    for any board; an array('H') holds any move code since codes fit in 16 bits. Gaps and 2s are walked by index rather than with for
+    loops, because every for loop creates an iterator object.
+
+    Returns:
+        int: Number of moves written
+    """
+    cells = state.cells
+    loc = state.loc
+    gap_slots = state.gap_slots
+    gaps = len(gap_slots)
+    count = 0
+    i = 0
+    while i < gaps:
+        gap = gap_slots[i]
+        i += 1
+        if IS_ROW_START[gap]:
+            t = 0
+            while t < 4:
+                src = two_src(loc, TWOS[t])
+                t += 1
+                if src != OFF_BOARD:
+                    buffer[count] = MOVE_CODES[src][gap]
+                    count += 1
+        else:
+            src = filler_src(cells, loc, gap)
+            if src != OFF_BOARD:
+                buffer[count] = MOVE_CODES[src][gap]
+                count += 1
+    return count
+
+
+class MoveStack:
+    """
+    Preallocated per-ply move buffers owned by a search.
+
+    Each ply gets its own MAX_BOARD_MOVES-entry array('H'), so a depth-first search
+    generates moves at every node without allocating lists or tuples, on boards
+    with any number of gaps.
+    """
+
+    def __init__(self, max_ply: int):
+        self.buffers = [array('H', bytes(2 * MAX_BOARD_MOVES)) for _ in range(max_ply)]
+        self.counts = array('B', bytes(max_ply))
+
+    def generate(self, state: 'GameState', ply: int) -> int:
+        """Fill ply's buffer with the position's legal moves and return how many there are"""
+        count = generate_into(state, self.buffers[ply])
+        self.counts[ply] = count
+        return count
+
+    def move(self, ply: int, index: int) -> int:
+        """The index-th move generated at ply"""
+        return self.buffers[ply][index]
+
+
+def move_src(move: int) -> int:
+    """Slot the card moves from"""
+    return move >> MOVE_SHIFT
+
+
+def move_dst(move: int) -> int:
+    """Gap slot the card moves into"""
+    return move & MOVE_MASK
+
+
+def move_card(state: 'GameState', move: int) -> int:
+    """Code of the card a move relocates, read before the move is applied"""
+    return state.cells[move >> MOVE_SHIFT]
+
+
+def format_move(state: 'GameState', move: int) -> str:
+    """Human-readable move in the style GameManager prints, e.g. "4C -> R2C4" """
+    row, col = divmod(move & MOVE_MASK, COLS)
+    return f"{CARD_NAME[state.cells[move >> MOVE_SHIFT]]} -> R{row + 1}C{col + 1}"
+
+
+# Macro moves: a first move plus a step limit for the forced gap chain it starts.
+# Packed as steps << 12 | move, where steps == 0 runs the chain until it dies.
+MACRO_SHIFT = 12
+MACRO_MOVE_MASK = (1 << MACRO_SHIFT) - 1
+MAX_CHAIN_STEPS = 52  # Termination guard; a real chain dies long before this
+
+
+def encode_macro(move: int, steps: int = 0) -> int:
+    """Pack a macro move: the first move and how many chain steps to take in total"""
+    return (steps << MACRO_SHIFT) | move
+
+
+def next_chain_move(state: 'GameState', gap: int) -> int:
+    """
+    The forced move into a gap opened by the previous chain step, or -1 if the chain ends.
+
+    A chain ends at a dead gap and at a column-0 gap, where choosing among the 2s is a
+    real decision rather than a forced step.
+    """
+    if IS_ROW_START[gap]:
+        return -1
+    src = filler_src(state.cells, state.loc, gap)
+    if src == OFF_BOARD:
+        return -1
+    return MOVE_CODES[src][gap]
+
+
+def apply_macro(state: 'GameState', macro: int) -> List[tuple]:
+    """
+    Play a macro move in place: its first move, then the forced chain behind it.
+
+    Returns:
+        List of undo tokens in play order; pass it to undo_macro to restore exactly
+    """
+    move = macro & MACRO_MOVE_MASK
+    steps = macro >> MACRO_SHIFT or MAX_CHAIN_STEPS
+    tokens = [state.apply_move(move)]
+    while len(tokens) < steps:
+        move = next_chain_move(state, move >> MOVE_SHIFT)
+        if move < 0:
+            break
+        tokens.append(state.apply_move(move))
+    return tokens
+
+
+def undo_macro(state: 'GameState', tokens: List[tuple]):
+    """Undo a macro move played by apply_macro"""
+    for token in reversed(tokens):
+        state.undo_move(token)
+
+
+def chain_length(state: 'GameState', move: int) -> int:
+    """Number of moves in the full chain started by move, found by playing and undoing it"""
+    tokens = apply_macro(state, encode_macro(move))
+    undo_macro(state, tokens)
+    return len(tokens)
+
+
+def generate_macro_moves(state: 'GameState', all_stops: bool = False) -> List[int]:
+    """
+    Macro moves of a position, one per legal first move.
+
+    By default each macro runs its chain to the end. With all_stops, every possible
+    stopping point of every chain is offered as its own macro move.
+    """
+    moves = state.legal_moves()
+    if not all_stops:
+        return [encode_macro(move) for move in moves]
+    return [
+        encode_macro(move, steps)
+        for move in moves
+        for steps in range(1, chain_length(state, move) + 1)
+    ]
+
+
+# Partial-order reduction. A move writes its source and target cells and reads the
+# target's left neighbour (outside column 0). Two moves whose writes miss each
+# other's writes and reads are independent: both stay legal after the other, and
+# playing them in either order reaches the same position. Locking cannot break
+# this, because a cascade only locks cards that have no gap to move into.
+
+def move_writes(move: int) -> int:
+    """Slot bitmask of the cells a move changes"""
+    return (1 << (move >> MOVE_SHIFT)) | (1 << (move & MOVE_MASK))
+
+
+def move_reads(move: int) -> int:
+    """Slot bitmask of the cells a move's legality depends on besides its own"""
+    dst = move & MOVE_MASK
+    return 0 if IS_ROW_START[dst] else 1 << (dst - 1)
+
+
+def independent(first: int, second: int) -> bool:
+    """Whether two legal moves of the same position commute"""
+    first_writes = move_writes(first)
+    second_writes = move_writes(second)
+    return not (
+        first_writes & (second_writes | move_reads(second))
+        or second_writes & move_reads(first)
+    )
+
+
+def sleep_set_children(moves: List[int], sleep: Tuple[int, ...] = ()):
+    """
+    Iterate a node's moves with sleep sets, so each interleaving of independent moves
+    is explored once.
+
+    Moves in the node's sleep set are skipped. Each yielded move comes with the sleep
+    set for its child: the sleeping and already explored siblings that commute with it.
+
+    Yields:
+        Tuples of (move, child_sleep)
+    """
+    explored = list(sleep)
+    for move in moves:
+        if move in sleep:
+            continue
+        yield move, tuple(other for other in explored if independent(other, move))
+        explored.append(move)
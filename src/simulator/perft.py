@@ -0,0 +1,126 @@
+"""
+Perft: move-generation node counting for correctness checks and benchmarking.
+
+Counts the leaf nodes exactly `depth` moves below a position, as chess engines do.
+Because the counts depend only on the rules, they serve as a regression oracle for
+GameState and move generation, and their rate is the standard throughput benchmark.
+
+Usage, from the repository root:
+    python -m src.simulator.perft saves/<game_id>.json 5 [--divide] [--tt]
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.simulator.game_state import GameState
+from src.simulator.move_gen import format_move
+
+
+def perft(state: GameState, depth: int, table: Optional[Dict[Tuple[bytes, int], int]] = None) -> int:
+    """
+    Count leaf nodes depth moves below state, walking with apply_move/undo_move.
+
+    Positions that run out of moves earlier contribute no leaves. When a table is
+    given, subtree counts are cached by position key and remaining depth.
+
+    The table uses raw keys rather than canonical ones. Every card is distinct and
+    moves never relabel suits, so positions reachable from one root are almost
+    never symmetric to each other: canonical keys find no extra transpositions
+    and cost 24 row orders per probe.
+
+    Raises:
+        ValueError: If depth is negative
+    """
+    if depth < 1:
+        if depth < 0:
+            raise ValueError(f"Depth must be non-negative, got {depth}")
+        return 1
+    moves = state.legal_moves()
+    if depth == 1:
+        return len(moves)
+
+    if table is not None:
+        key = (state.to_key(), depth)
+        count = table.get(key)
+        if count is not None:
+            return count
+
+    count = 0
+    for move in moves:
+        token = state.apply_move(move)
+        count += perft(state, depth - 1, table)
+        state.undo_move(token)
+
+    if table is not None:
+        table[key] = count
+    return count
+
+
+def divide(state: GameState, depth: int,
+           table: Optional[Dict[Tuple[bytes, int], int]] = None) -> List[Tuple[int, int]]:
+    """
+    Perft broken down per root move, as (move, leaf count) pairs.
+
+    Raises:
+        ValueError: If depth is less than 1
+    """
+    if depth < 1:
+        raise ValueError(f"Divide needs a depth of at least 1, got {depth}")
+    results = []
+    for move in list(state.legal_moves()):
+        token = state.apply_move(move)
+        results.append((move, perft(state, depth - 1, table)))
+        state.undo_move(token)
+    return results
+
+
+def load_saved_deal(path: str) -> GameState:
+    """Load a saves/*.json flat board into a GameState"""
+    with open(path) as f:
+        return GameState.from_flat(json.load(f))
+
+
+def non_negative_int(text: str) -> int:
+    """argparse type for depths"""
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"must be non-negative, got {value}")
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count move-generation leaf nodes from a saved deal")
+    parser.add_argument("save", help="Saved deal in saves/*.json format")
+    parser.add_argument("depth", type=non_negative_int, help="Search depth in moves")
+    parser.add_argument("--divide", action="store_true", help="Break counts down per root move")
+    parser.add_argument("--tt", action="store_true", help="Cache subtree counts by position key")
+    args = parser.parse_args()
+
+    try:
+        state = load_saved_deal(args.save)
+    except (OSError, ValueError) as e:
+        print(f"Cannot load {args.save}: {e}")
+        sys.exit(1)
+
+    table = {} if args.tt else None
+    start = time.perf_counter()
+    if args.divide and args.depth > 0:
+        results = divide(state, args.depth, table)
+        for move, count in results:
+            print(f"{format_move(state, move)}: {count:,}")
+        nodes = sum(count for _, count in results)
+    else:
+        nodes = perft(state, args.depth, table)
+    elapsed = time.perf_counter() - start
+
+    print(f"\nDepth {args.depth}: {nodes:,} nodes in {elapsed:.3f}s "
+          f"({nodes / elapsed if elapsed > 0 else 0:,.0f} nodes/s)")
+    if table is not None:
+        print(f"Transposition entries: {len(table):,}")
+
+
+if __name__ == "__main__":
+    main()
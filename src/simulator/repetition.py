@@ -0,0 +1,57 @@
+"""
+Path-local repetition detection for search.
+
+Moving a card out of a slot opens a gap another card can fill, so some move
+sequences return to a position already on the current path. Search engines cut
+such cycles by entering each position's Zobrist key when descending and leaving
+it when backing up.
+"""
+
+from typing import Dict, Set
+
+
+class RepetitionTable:
+    """
+    Zobrist keys of the positions on the current search path.
+
+    Keys are 64-bit, so a false repetition would need a full key collision between
+    two positions on one path.
+    """
+
+    def __init__(self):
+        self._path: Set[int] = set()
+        self.probes = 0  # enter() calls
+        self.cycles = 0  # enter() calls that found a repetition
+
+    def enter(self, key: int) -> bool:
+        """
+        Push a position onto the path.
+
+        Returns:
+            bool: True if the position was entered, False if it is already on the
+            path and the move leading here closes a cycle
+        """
+        self.probes += 1
+        if key in self._path:
+            self.cycles += 1
+            return False
+        self._path.add(key)
+        return True
+
+    def leave(self, key: int):
+        """Pop a position entered with enter()"""
+        self._path.discard(key)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._path
+
+    def __len__(self) -> int:
+        return len(self._path)
+
+    def clear(self):
+        """Empty the path, keeping the counters"""
+        self._path.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for reporting how often cycle cutting fired"""
+        return {"probes": self.probes, "cycles": self.cycles, "depth": len(self._path)}
@@ -0,0 +1,102 @@
+"""
+Seeded self-play games for building evaluator training data.
+
+A game is a seeded deal played phase by phase with a greedy one-ply policy: each
+move is the one whose resulting position the evaluator scores highest, ties
+broken by the game's random generator, never returning to a position already seen
+this phase. When a phase runs out of moves the unlocked cards and gaps are
+redealt, up to the reshuffle limit, exactly as the physical game does.
+
+Every position visited is recorded with the number of reshuffles still to come,
+and the whole game is labelled with its final locked card count.
+"""
+
+import random
+from typing import List, NamedTuple, Optional
+
+from src.simulator.cards import COLS, NUM_SLOTS
+from src.simulator.evaluator import Evaluator, features
+from src.simulator.game_state import GameState, deal
+from src.simulator.repetition import RepetitionTable
+
+RESHUFFLES = 3
+MAX_PHASE_MOVES = 1000  # Termination guard; greedy phases end far sooner
+
+
+class GameRecord(NamedTuple):
+    """Positions of one self-play game and its outcome"""
+    seed: int
+    boards: List[bytes]  # GameState.to_key() of every position visited
+    features: List[tuple]  # evaluator.features() of the same positions
+    reshuffles_remaining: List[int]  # Reshuffles still available at each position
+    final_locked: int  # Locked cards when the game ended
+
+
+def redeal(state: GameState, rng: random.Random) -> GameState:
+    """
+    Reshuffle a position: locked runs stay, every other card and the 4 gaps are
+    redistributed uniformly over the unlocked cells. Cards dealt into place extend
+    the locked runs, as they do at the table.
+    """
+    cells = state.cells
+    unlocked_slots = [
+        slot for slot in range(NUM_SLOTS) if slot % COLS >= state.locked_len[slot // COLS]
+    ]
+    pool = [cells[slot] for slot in unlocked_slots]
+    rng.shuffle(pool)
+    new_cells = list(cells)
+    for slot, code in zip(unlocked_slots, pool):
+        new_cells[slot] = code
+    return GameState.from_key(bytes(code & 0xFF for code in new_cells))
+
+
+def greedy_move(state: GameState, evaluator: Evaluator, rng: random.Random,
+                repetitions: RepetitionTable) -> Optional[int]:
+    """Best-scoring move into a position not yet seen this phase, or None if there is none"""
+    best_moves = []
+    best_score = None
+    for move in state.legal_moves():
+        token = state.apply_move(move)
+        if state.zobrist not in repetitions:
+            score = evaluator.evaluate(state)
+            if best_score is None or score > best_score:
+                best_moves = [move]
+                best_score = score
+            elif score == best_score:
+                best_moves.append(move)
+        state.undo_move(token)
+    if not best_moves:
+        return None
+    return best_moves[rng.randrange(len(best_moves))]
+
+
+def play_game(seed: int, evaluator: Optional[Evaluator] = None,
+              reshuffles: int = RESHUFFLES) -> GameRecord:
+    """Play one seeded game greedily and record every position it visits"""
+    evaluator = evaluator or Evaluator()
+    rng = random.Random(seed)
+    state = deal(rng)
+    boards, values, remaining = [], [], []
+
+    for phase in range(reshuffles + 1):
+        repetitions = RepetitionTable()
+        repetitions.enter(state.zobrist)
+        for _ in range(MAX_PHASE_MOVES):
+            boards.append(state.to_key())
+            values.append(features(state))
+            remaining.append(reshuffles - phase)
+            move = greedy_move(state, evaluator, rng, repetitions)
+            if move is None:
+                break
+            state.apply_move(move)
+            repetitions.enter(state.zobrist)
+        if phase < reshuffles:
+            state = redeal(state, rng)
+
+    return GameRecord(
+        seed=seed,
+        boards=boards,
+        features=values,
+        reshuffles_remaining=remaining,
+        final_locked=state.locked_count(),
+    )
@@ -0,0 +1,103 @@
+"""
+Row and suit symmetry of Gaps positions.
+
+Any row can hold any suit and the four suits play identically, so positions that
+differ only by a row permutation plus a suit relabeling have the same value. A
+position's canonical form is the smallest position key over all 24 x 24 such
+transforms; transposition tables keyed on it share entries across the whole
+symmetry class.
+"""
+
+from itertools import permutations
+from typing import List, Tuple
+
+from src.simulator.cards import (
+    COLS, ROWS, DECK, CARD_RANK, CARD_SUIT, MOVE_SHIFT, MOVE_MASK, encode_card
+)
+
+GAP_BYTE = 0xFF  # GAP as it appears in a position key
+
+# A transform is (row_order, suit_map): canonical row i holds original row row_order[i],
+# and a card of suit s is relabeled to suit suit_map[s]
+Transform = Tuple[Tuple[int, ...], Tuple[int, ...]]
+
+IDENTITY: Transform = (tuple(range(ROWS)), tuple(range(4)))
+
+ROW_ORDERS: List[Tuple[int, ...]] = list(permutations(range(ROWS)))
+
+
+def _suit_table(suit_map: Tuple[int, ...]) -> bytes:
+    """bytes.translate table relabeling every card code's suit"""
+    table = bytearray(range(256))
+    for code in DECK:
+        table[code] = encode_card(CARD_RANK[code], suit_map[CARD_SUIT[code]])
+    return bytes(table)
+
+
+SUIT_TABLES = {suit_map: _suit_table(suit_map) for suit_map in permutations(range(4))}
+
+
+def canonical_key(key: bytes) -> Tuple[bytes, Transform]:
+    """
+    Map a position key to the unique representative of its symmetry class.
+
+    For a fixed row order the lexicographically smallest relabeling numbers suits
+    in order of first appearance, so only the 24 row orders need comparing.
+
+    Returns:
+        Tuple of the canonical key and the transform that produces it from key
+    """
+    rows = [key[row * COLS:(row + 1) * COLS] for row in range(ROWS)]
+    best_key = None
+    best_transform = IDENTITY
+    for order in ROW_ORDERS:
+        permuted = rows[order[0]] + rows[order[1]] + rows[order[2]] + rows[order[3]]
+        suit_map = [-1, -1, -1, -1]
+        next_suit = 0
+        for byte in permuted:
+            if byte != GAP_BYTE:
+                suit = byte // COLS
+                if suit_map[suit] < 0:
+                    suit_map[suit] = next_suit
+                    next_suit += 1
+                    if next_suit == 4:
+                        break
+        for suit in range(4):  # Suits absent from the board keep their relative order
+            if suit_map[suit] < 0:
+                suit_map[suit] = next_suit
+                next_suit += 1
+        suit_map = tuple(suit_map)
+        candidate = permuted.translate(SUIT_TABLES[suit_map])
+        if best_key is None or candidate < best_key:
+            best_key = candidate
+            best_transform = (order, suit_map)
+    return best_key, best_transform
+
+
+def transform_slot(slot: int, transform: Transform) -> int:
+    """Map an original slot to its slot in the canonical position"""
+    row, col = divmod(slot, COLS)
+    return transform[0].index(row) * COLS + col
+
+
+def untransform_slot(slot: int, transform: Transform) -> int:
+    """Map a canonical slot back to its slot in the original position"""
+    row, col = divmod(slot, COLS)
+    return transform[0][row] * COLS + col
+
+
+def transform_move(move: int, transform: Transform) -> int:
+    """Map an original move into the canonical position"""
+    return ((transform_slot(move >> MOVE_SHIFT, transform) << MOVE_SHIFT)
+            | transform_slot(move & MOVE_MASK, transform))
+
+
+def untransform_move(move: int, transform: Transform) -> int:
+    """Map a move found in the canonical position back to the original position"""
+    return ((untransform_slot(move >> MOVE_SHIFT, transform) << MOVE_SHIFT)
+            | untransform_slot(move & MOVE_MASK, transform))
+
+
+def transform_card(code: int, transform: Transform) -> int:
+    """Relabel a card code's suit under the transform"""
+    return encode_card(CARD_RANK[code], transform[1][CARD_SUIT[code]])
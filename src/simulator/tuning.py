@@ -0,0 +1,146 @@
+"""
+Offline tuning of the evaluator weights from self-play.
+
+Plays a batch of seeded self-play games, records every visited position's
+features, board and reshuffles remaining together with the game's final locked
+card count into a NumPy .npz dataset, then fits the weights by least squares so
+the evaluation predicts the final locked cards. The fitted weights are written to
+the file the evaluator loads at startup.
+
+Self-play uses DEFAULT_WEIGHTS, not the tuned weights, so each fit starts from
+data that the previous fit did not shape. Pass --play-tuned to deliberately
+iterate, playing with the current tuned weights to fit the next ones.
+
+Usage, from the repository root:
+    python -m src.simulator.tuning --games 500 [--seed 0] [--dataset PATH]
+                                   [--weights PATH] [--fit-only] [--play-tuned]
+
+Requires NumPy.
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from src.simulator.evaluator import (
+    DATA_DIR, DEFAULT_WEIGHTS, FEATURE_NAMES, WEIGHTS_PATH, Evaluator, save_weights
+)
+from src.simulator.selfplay import play_game
+
+DATASET_PATH = os.path.join(DATA_DIR, "selfplay.npz")
+
+
+def build_dataset(seeds: Iterable[int], evaluator: Optional[Evaluator] = None) -> Dict[str, np.ndarray]:
+    """
+    Self-play one game per seed and stack every recorded position.
+
+    Games are played with DEFAULT_WEIGHTS unless an evaluator is given, so tuned
+    weights already on disk do not leak into the data used to fit new ones.
+
+    Returns:
+        Dict of arrays, one row per position: features (M, F) float64, boards
+        (M, 52) int8, reshuffles_remaining (M,) int8, final_locked (M,) int16 and
+        seed (M,) int64, plus feature_names
+    """
+    evaluator = evaluator or Evaluator(DEFAULT_WEIGHTS)
+    boards, values, remaining, final_locked, game_seeds = [], [], [], [], []
+    for seed in seeds:
+        record = play_game(seed, evaluator)
+        positions = len(record.boards)
+        boards.extend(record.boards)
+        values.extend(record.features)
+        remaining.extend(record.reshuffles_remaining)
+        final_locked.extend([record.final_locked] * positions)
+        game_seeds.extend([seed] * positions)
+    return {
+        "features": np.array(values, dtype=np.float64).reshape(-1, len(FEATURE_NAMES)),
+        "boards": np.frombuffer(b"".join(boards), dtype=np.int8).reshape(-1, 52),
+        "reshuffles_remaining": np.array(remaining, dtype=np.int8),
+        "final_locked": np.array(final_locked, dtype=np.int16),
+        "seed": np.array(game_seeds, dtype=np.int64),
+        "feature_names": np.array(FEATURE_NAMES),
+    }
+
+
+def save_dataset(path: str, data: Dict[str, np.ndarray]):
+    """Write a dataset from build_dataset to a compressed .npz file"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    np.savez_compressed(path, **data)
+
+
+def load_dataset(path: str) -> Dict[str, np.ndarray]:
+    """
+    Read a dataset written by save_dataset.
+
+    Raises:
+        ValueError: If it was recorded with different evaluator features
+    """
+    with np.load(path) as npz:
+        data = {name: npz[name] for name in npz.files}
+    if tuple(data["feature_names"]) != FEATURE_NAMES:
+        raise ValueError(f"Dataset features {tuple(data['feature_names'])} do not match {FEATURE_NAMES}")
+    return data
+
+
+def fit_weights(features: np.ndarray, targets: np.ndarray) -> Tuple[Dict[str, float], float, float]:
+    """
+    Least-squares fit of targets ~ features @ weights + intercept.
+
+    The intercept shifts every score equally, so it does not change move choices
+    and is not part of the evaluator weights.
+
+    Returns:
+        Tuple of (weights by feature name, intercept, R^2 of the fit)
+    """
+    design = np.hstack([features, np.ones((len(features), 1))])
+    coefficients, *_ = np.linalg.lstsq(design, targets.astype(np.float64), rcond=None)
+    residual = targets - design @ coefficients
+    spread = np.sum((targets - targets.mean()) ** 2)
+    r_squared = 1.0 - np.sum(residual ** 2) / spread if spread > 0 else 0.0
+    weights = {name: float(weight) for name, weight in zip(FEATURE_NAMES, coefficients[:-1])}
+    return weights, float(coefficients[-1]), float(r_squared)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune evaluator weights from self-play games")
+    parser.add_argument("--games", type=int, default=500, help="Number of seeded self-play games")
+    parser.add_argument("--seed", type=int, default=0, help="First game seed")
+    parser.add_argument("--dataset", default=DATASET_PATH, help="Dataset .npz to write, or read with --fit-only")
+    parser.add_argument("--weights", default=WEIGHTS_PATH, help="Weights file to write")
+    parser.add_argument("--fit-only", action="store_true", help="Fit an existing dataset without playing")
+    parser.add_argument("--play-tuned", action="store_true",
+                        help="Self-play with the current tuned weights instead of DEFAULT_WEIGHTS")
+    args = parser.parse_args()
+
+    if args.fit_only:
+        try:
+            data = load_dataset(args.dataset)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Cannot load {args.dataset}: {e}")
+            sys.exit(1)
+    else:
+        start = time.perf_counter()
+        evaluator = Evaluator() if args.play_tuned else None
+        data = build_dataset(range(args.seed, args.seed + args.games), evaluator)
+        elapsed = time.perf_counter() - start
+        save_dataset(args.dataset, data)
+        print(f"Played {args.games:,} games, {len(data['final_locked']):,} positions "
+              f"in {elapsed:.1f}s -> {args.dataset}")
+
+    weights, intercept, r_squared = fit_weights(data["features"], data["final_locked"])
+    for name, weight in weights.items():
+        print(f"  {name:<16} {weight:+.4f}")
+    print(f"  {'intercept':<16} {intercept:+.4f}   R^2 = {r_squared:.3f}")
+
+    games = len(np.unique(data["seed"]))
+    save_weights(weights, args.weights, games=games, positions=len(data["final_locked"]),
+                 intercept=intercept, r_squared=r_squared)
+    print(f"Weights written to {args.weights}")
+
+
+if __name__ == "__main__":
+    main()
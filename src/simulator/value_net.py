@@ -0,0 +1,285 @@
+"""
+Learned value network: a small MLP predicting final locked cards, in pure NumPy.
+
+The network reads boards as flat card-code arrays, the same (N, 52) int8 layout
+as GameState.cells stacked, so a search scores hundreds of leaves with a few
+matrix products per call. Training runs on CPU from the self-play datasets
+written by src.simulator.tuning.
+
+Board encoding, per slot: gap, locked, rank / 13 and whether the card follows
+its left neighbour in suit, followed by the handcrafted evaluator features. Inputs
+are standardized with statistics stored in the model. The network does not see
+how many reshuffles remain; within one search every leaf shares that number.
+
+Model files are .npz archives holding the layer weights and biases (W0, b0, W1,
+b1, ...), the input mean and scale, and the target mean and scale.
+
+Models are written to data/ at the repository root, which git ignores, like the
+tuning command's datasets and weights.
+
+Usage, from the repository root:
+    python -m src.simulator.value_net [--dataset PATH] [--model PATH]
+                                      [--hidden 64,32] [--epochs 30] [--seed 0]
+
+Requires NumPy.
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from src.simulator.batch import RANK_TABLE, features_batch, locked_mask
+from src.simulator.cards import ROWS, COLS, GAP, NUM_SLOTS
+from src.simulator.evaluator import DATA_DIR
+from src.simulator.tuning import DATASET_PATH, load_dataset
+
+if TYPE_CHECKING:
+    from src.simulator.game_state import GameState
+
+MODEL_PATH = os.path.join(DATA_DIR, "value_net.npz")
+# Inputs varying less than this in training are left unscaled rather than divided
+# by a tiny std, which would amplify any variation seen at inference
+MIN_INPUT_STD = 0.05
+
+
+def encode_boards(boards: np.ndarray) -> np.ndarray:
+    """
+    Network inputs of N boards.
+
+    Returns:
+        (N, 4 * 52 + number of evaluator features) float32 array, unstandardized
+    """
+    rows = boards.reshape(-1, ROWS, COLS)
+    follows = np.zeros(rows.shape, dtype=bool)
+    follows[:, :, 1:] = (rows[:, :, 1:] == rows[:, :, :-1] + 1) & (rows[:, :, 1:] != GAP)
+    return np.hstack([
+        (boards == GAP),
+        locked_mask(boards).reshape(-1, NUM_SLOTS),
+        RANK_TABLE[boards] / 13.0,
+        follows.reshape(-1, NUM_SLOTS),
+        features_batch(boards),
+    ]).astype(np.float32)
+
+
+class ValueNet:
+    """
+    Fully connected ReLU network with one linear output, in NumPy.
+
+    Provides the same evaluate(state) and evaluate_batch(boards) interface as the
+    handcrafted Evaluator, so search code can use either.
+    """
+
+    def __init__(self, weights: List[np.ndarray], biases: List[np.ndarray],
+                 input_mean: np.ndarray, input_scale: np.ndarray,
+                 target_mean: float = 0.0, target_scale: float = 1.0):
+        self.weights = [w.astype(np.float32) for w in weights]
+        self.biases = [b.astype(np.float32) for b in biases]
+        self.input_mean = input_mean.astype(np.float32)
+        self.input_scale = input_scale.astype(np.float32)
+        self.target_mean = float(target_mean)
+        self.target_scale = float(target_scale)
+
+    @classmethod
+    def initialize(cls, input_size: int, hidden: Sequence[int], seed: int = 0) -> 'ValueNet':
+        """Fresh network with He-initialized weights and identity standardization"""
+        rng = np.random.default_rng(seed)
+        sizes = [input_size, *hidden, 1]
+        weights = [
+            rng.normal(0.0, np.sqrt(2.0 / fan_in), (fan_in, fan_out))
+            for fan_in, fan_out in zip(sizes[:-1], sizes[1:])
+        ]
+        biases = [np.zeros(fan_out) for fan_out in sizes[1:]]
+        return cls(weights, biases, np.zeros(input_size), np.ones(input_size))
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH) -> 'ValueNet':
+        """
+        Read a model written by save().
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If its input size does not match encode_boards
+        """
+        with np.load(path) as npz:
+            layers = sum(1 for name in npz.files if name.startswith("W"))
+            net = cls(
+                [npz[f"W{i}"] for i in range(layers)],
+                [npz[f"b{i}"] for i in range(layers)],
+                npz["input_mean"], npz["input_scale"],
+                float(npz["target_mean"]), float(npz["target_scale"]),
+            )
+        expected = encode_boards(np.full((1, NUM_SLOTS), GAP, dtype=np.int8)).shape[1]
+        if net.weights[0].shape[0] != expected:
+            raise ValueError(f"Model expects {net.weights[0].shape[0]} inputs, encoding has {expected}")
+        return net
+
+    def save(self, path: str = MODEL_PATH):
+        """Write the model as an .npz archive"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        arrays = {f"W{i}": w for i, w in enumerate(self.weights)}
+        arrays.update({f"b{i}": b for i, b in enumerate(self.biases)})
+        np.savez(path, input_mean=self.input_mean, input_scale=self.input_scale,
+                 target_mean=self.target_mean, target_scale=self.target_scale, **arrays)
+
+    def _forward(self, inputs: np.ndarray) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """Normalized output (N,) and the activations entering each layer"""
+        activation = (inputs - self.input_mean) / self.input_scale
+        activations = [activation]
+        for weight, bias in zip(self.weights[:-1], self.biases[:-1]):
+            activation = np.maximum(activation @ weight + bias, 0.0)
+            activations.append(activation)
+        output = activation @ self.weights[-1] + self.biases[-1]
+        return output[:, 0], activations
+
+    def evaluate_batch(self, boards: np.ndarray) -> np.ndarray:
+        """Predicted final locked cards of N boards, as an (N,) float64 array"""
+        output, _ = self._forward(encode_boards(boards))
+        return output.astype(np.float64) * self.target_scale + self.target_mean
+
+    def evaluate(self, state: 'GameState') -> float:
+        """
+        Predicted final locked cards of one position, cached on the state like Evaluator's.
+
+        Equal to evaluate_batch on the position alone. Inside a larger batch the
+        float32 products may be summed in another order, so scores can differ in
+        the last bits; compare scores from one path or the other, not both.
+        """
+        cached = state._evaluation_cache
+        if cached is not None and cached[0] is self:
+            return cached[1]
+        board = np.frombuffer(state.cells.tobytes(), dtype=np.int8).reshape(1, NUM_SLOTS)
+        score = float(self.evaluate_batch(board)[0])
+        state._evaluation_cache = (self, score)
+        return score
+
+
+def train(boards: np.ndarray, targets: np.ndarray, hidden: Sequence[int] = (64, 32),
+          epochs: int = 30, batch_size: int = 256, learning_rate: float = 1e-3,
+          validation: float = 0.1, seed: int = 0, groups: Optional[np.ndarray] = None,
+          log: Optional[Callable[[str], None]] = None) -> Tuple[ValueNet, Dict[str, float]]:
+    """
+    Fit a ValueNet to boards -> final locked cards by mean squared error with Adam.
+
+    A random validation fraction of the positions is held out and reported. Given
+    groups (such as the dataset's game seeds), whole groups are held out instead,
+    since positions from one game share their label. With a validation set, the
+    weights from the epoch with the lowest validation error are kept.
+
+    Returns:
+        Tuple of (trained network, dict of train_rmse, validation_rmse and
+        baseline_rmse in locked cards, where the baseline always predicts the
+        training mean; a model not beating it has learned nothing useful)
+    """
+    rng = np.random.default_rng(seed)
+    inputs = encode_boards(boards)
+    if groups is None:
+        order = rng.permutation(len(inputs))
+        held_out = int(len(inputs) * validation)
+        valid_index, train_index = order[:held_out], order[held_out:]
+    else:
+        unique = rng.permutation(np.unique(groups))
+        is_valid = np.isin(groups, unique[:int(len(unique) * validation)])
+        valid_index, train_index = np.flatnonzero(is_valid), np.flatnonzero(~is_valid)
+
+    net = ValueNet.initialize(inputs.shape[1], hidden, seed)
+    net.input_mean = inputs[train_index].mean(axis=0).astype(np.float32)
+    input_std = inputs[train_index].std(axis=0)
+    net.input_scale = np.where(input_std < MIN_INPUT_STD, 1.0, input_std).astype(np.float32)
+    net.target_mean = float(targets[train_index].mean())
+    net.target_scale = float(targets[train_index].std()) or 1.0
+    normalized = ((targets - net.target_mean) / net.target_scale).astype(np.float32)
+
+    params = net.weights + net.biases
+    first_moment = [np.zeros_like(p) for p in params]
+    second_moment = [np.zeros_like(p) for p in params]
+    beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+    step = 0
+
+    def rmse(index: np.ndarray) -> float:
+        if len(index) == 0:
+            return float("nan")
+        output, _ = net._forward(inputs[index])
+        return float(np.sqrt(np.mean((output - normalized[index]) ** 2)) * net.target_scale)
+
+    baseline_rmse = (float(np.sqrt(np.mean((targets[valid_index] - net.target_mean) ** 2)))
+                     if len(valid_index) else float("nan"))
+    best_rmse = float("inf")
+    best_params = None
+
+    for epoch in range(epochs):
+        rng.shuffle(train_index)
+        for start in range(0, len(train_index), batch_size):
+            index = train_index[start:start + batch_size]
+            output, activations = net._forward(inputs[index])
+            # Backpropagate d(mean squared error) through the layers
+            delta = (2.0 / len(index)) * (output - normalized[index])[:, None]
+            weight_grads, bias_grads = [], []
+            for layer in range(len(net.weights) - 1, -1, -1):
+                weight_grads.append(activations[layer].T @ delta)
+                bias_grads.append(delta.sum(axis=0))
+                if layer > 0:
+                    delta = (delta @ net.weights[layer].T) * (activations[layer] > 0)
+            grads = weight_grads[::-1] + bias_grads[::-1]
+
+            step += 1
+            for i, (param, grad) in enumerate(zip(params, grads)):
+                first_moment[i] = beta1 * first_moment[i] + (1 - beta1) * grad
+                second_moment[i] = beta2 * second_moment[i] + (1 - beta2) * grad * grad
+                corrected = first_moment[i] / (1 - beta1 ** step)
+                scale = np.sqrt(second_moment[i] / (1 - beta2 ** step)) + epsilon
+                param -= (learning_rate * corrected / scale).astype(param.dtype)
+        validation_rmse = rmse(valid_index)
+        if validation_rmse < best_rmse:
+            best_rmse = validation_rmse
+            best_params = [param.copy() for param in params]
+        if log:
+            log(f"epoch {epoch + 1:3d}: train rmse {rmse(train_index):.3f}, "
+                f"validation rmse {validation_rmse:.3f}")
+
+    if best_params is not None:
+        for param, best in zip(params, best_params):
+            param[...] = best
+    return net, {
+        "train_rmse": rmse(train_index),
+        "validation_rmse": rmse(valid_index),
+        "baseline_rmse": baseline_rmse,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the value network on a self-play dataset")
+    parser.add_argument("--dataset", default=DATASET_PATH, help="Dataset written by src.simulator.tuning")
+    parser.add_argument("--model", default=MODEL_PATH, help="Model .npz to write")
+    parser.add_argument("--hidden", default="64,32", help="Comma-separated hidden layer sizes")
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--learning-rate", type=float, default=1e-3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        data = load_dataset(args.dataset)
+    except (OSError, KeyError, ValueError) as e:
+        print(f"Cannot load {args.dataset}: {e}")
+        sys.exit(1)
+
+    hidden = tuple(int(size) for size in args.hidden.split(",") if size)
+    start = time.perf_counter()
+    net, metrics = train(data["boards"], data["final_locked"], hidden, args.epochs,
+                         args.batch_size, args.learning_rate, seed=args.seed,
+                         groups=data["seed"], log=print)
+    elapsed = time.perf_counter() - start
+    net.save(args.model)
+    print(f"Trained on {len(data['boards']):,} positions in {elapsed:.1f}s: "
+          f"validation rmse {metrics['validation_rmse']:.3f} locked cards, "
+          f"predict-the-mean baseline {metrics['baseline_rmse']:.3f} -> {args.model}")
+    if not metrics["validation_rmse"] < metrics["baseline_rmse"]:
+        print("Warning: the model does not beat the baseline; record more self-play games")
+
+
+if __name__ == "__main__":
+    main()
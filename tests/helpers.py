@@ -0,0 +1,36 @@
+"""Seeded positions shared by the tests."""
+
+import random
+from typing import Iterator, List, Optional
+
+from src.simulator.game_state import GameState, deal
+
+
+def random_walk(seed: int, steps: int = 60, tokens: Optional[List[tuple]] = None) -> Iterator[GameState]:
+    """
+    Yield the positions of a seeded random walk from a seeded deal, mutating one state.
+
+    The deal and every position after a move are yielded, so a walk of n moves
+    yields n + 1 times. If tokens is a list, each move's undo token is appended to it.
+    """
+    state = deal(random.Random(seed))
+    rng = random.Random(seed)
+    yield state
+    for _ in range(steps):
+        moves = state.legal_moves()
+        if not moves:
+            return
+        token = state.apply_move(rng.choice(moves))
+        if tokens is not None:
+            tokens.append(token)
+        yield state
+
+
+def snapshot(state: GameState) -> tuple:
+    """Every field apply_move/undo_move maintain, in comparable form"""
+    return (
+        state.cells.tobytes(), state.loc.tobytes(), frozenset(state.gaps),
+        state.gap_slots.tobytes(), state.gap_mask, state.dead_gaps, state.king_trap_mask,
+        state.col0_gaps, state.king_traps, state.chained, state.zobrist,
+        tuple(state.locked_len), tuple(state.locked_suit),
+    )
@@ -0,0 +1,127 @@
+"""Deadlock analysis checked against exhaustive search of the phase."""
+
+import functools
+import unittest
+from typing import List, NamedTuple, Optional
+
+from src.simulator.cards import COLS, GAP, NO_CARD, NUM_SLOTS, MAX_LOCKED, MOVE_SHIFT, encode_card
+from src.simulator.deadlock import analyze_phase, dependency_graph, phase_lock_bound
+from src.simulator.evaluator import DEFAULT_WEIGHTS, Evaluator, can_improve, upper_bound
+from src.simulator.game_state import GameState
+from src.simulator.selfplay import play_game
+from tests.helpers import random_walk
+
+MAX_REACHABLE = 2000  # Positions whose phase has more reachable positions are skipped
+
+
+class Phase(NamedTuple):
+    """A position and everything reachable from it before the next reshuffle"""
+    state: GameState
+    positions: int
+    moved: frozenset  # Cards that move somewhere in the reachable set
+    max_locked: int
+
+
+def explore(state: GameState) -> Optional[Phase]:
+    """Search every position reachable from state, or None if there are more than MAX_REACHABLE"""
+    seen = {state.to_key()}
+    moved = set()
+    max_locked = state.locked_count()
+    stack = [state]
+    while stack:
+        position = stack.pop()
+        max_locked = max(max_locked, position.locked_count())
+        for move in position.legal_moves():
+            moved.add(position.cells[move >> MOVE_SHIFT])
+            child = position.copy()
+            child.apply_move(move)
+            key = child.to_key()
+            if key not in seen:
+                if len(seen) == MAX_REACHABLE:
+                    return None
+                seen.add(key)
+                stack.append(child)
+    return Phase(state, len(seen), frozenset(moved), max_locked)
+
+
+@functools.lru_cache(maxsize=None)
+def phases() -> List[Phase]:
+    """Seeded mid-phase positions: 3, 8 and 15 moves before each phase of a greedy game ends"""
+    evaluator = Evaluator(DEFAULT_WEIGHTS)
+    found = []
+    for seed in range(20):
+        record = play_game(seed, evaluator)
+        remaining = record.reshuffles_remaining
+        for end in range(len(remaining)):
+            if end + 1 < len(remaining) and remaining[end + 1] == remaining[end]:
+                continue
+            for back in (3, 8, 15):
+                if end >= back and remaining[end - back] == remaining[end]:
+                    phase = explore(GameState.from_key(record.boards[end - back]))
+                    if phase is not None:
+                        found.append(phase)
+    return found
+
+
+class DeadlockAnalysisTest(unittest.TestCase):
+    def test_stuck_cards_never_move(self):
+        phase_list = phases()
+        self.assertGreater(len(phase_list), 150)
+        for phase in phase_list:
+            report = analyze_phase(phase.state)
+            self.assertFalse(report.stuck & phase.moved)
+            self.assertLessEqual(phase.moved, report.movable)
+
+    def test_lock_bound_matches_report(self):
+        for phase in phases():
+            self.assertEqual(analyze_phase(phase.state).lock_bound, phase_lock_bound(phase.state))
+
+    def test_dependency_graph(self):
+        two_clubs, three_clubs, four_clubs, five_clubs = (encode_card(rank, 0) for rank in (2, 3, 4, 5))
+        two_diamonds, three_diamonds, king_diamonds = (encode_card(rank, 1) for rank in (2, 3, 13))
+        queen_hearts, king_hearts = encode_card(12, 2), encode_card(13, 2)
+        cells = [GAP] * NUM_SLOTS
+        cells[0:4] = [two_clubs, four_clubs, three_clubs, king_diamonds]
+        cells[COLS - 1] = queen_hearts
+        cells[COLS:COLS + 3] = [five_clubs, three_diamonds, two_diamonds]
+        cells[2 * COLS] = king_hearts
+        state = GameState.from_key(bytes(code & 0xFF for code in cells), validate=False)
+        expected = {
+            three_clubs: four_clubs,  # 2C is locked in column 0, 4C sits right of it
+            four_clubs: king_diamonds,
+            five_clubs: three_clubs,
+            three_diamonds: GAP,  # The cell right of 2D is free
+            king_diamonds: NO_CARD,  # QD is not on the board
+            queen_hearts: NO_CARD,
+            king_hearts: NO_CARD,  # QH is in the last column
+        }
+        self.assertEqual(dependency_graph(state), expected)
+        self.assertEqual(analyze_phase(state).blockers, expected)
+
+
+
+class UpperBoundTest(unittest.TestCase):
+    def test_bound_is_admissible(self):
+        for phase in phases():
+            bound = upper_bound(phase.state, 0)
+            self.assertLessEqual(phase.max_locked, bound)
+            self.assertTrue(can_improve(phase.state, 0, phase.max_locked - 1))
+            self.assertFalse(can_improve(phase.state, 0, bound))
+
+    def test_bound_with_reshuffles_left(self):
+        for phase in phases():
+            for reshuffles in (1, 2, 3):
+                self.assertEqual(upper_bound(phase.state, reshuffles), MAX_LOCKED)
+
+    def test_stuck_positions(self):
+        stuck = 0
+        for seed in range(100):
+            for state in random_walk(seed, steps=2000):
+                if state.is_stuck():
+                    stuck += 1
+                    self.assertEqual(upper_bound(state, 0), state.locked_count())
+        self.assertGreater(stuck, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+"""Incremental evaluation features and the scalar and batch evaluators."""
+
+import os
+import random
+import tempfile
+import unittest
+
+from src.simulator.cards import CARD_RANK, DECK, ROWS, COLS, GAP, NUM_SLOTS, encode_card
+from src.simulator.evaluator import (
+    DEFAULT_WEIGHTS, Evaluator, features, load_weights, redeal_expectation, save_weights
+)
+from src.simulator.game_state import GameState, deal
+from src.simulator.move_gen import moves_into
+from src.simulator.selfplay import play_game, redeal
+from tests.helpers import random_walk
+
+try:
+    import numpy as np
+    from src.simulator.batch import evaluate_batch, features_batch, stack_states
+except ImportError:  # NumPy is optional outside the batch components
+    np = None
+
+
+def recount(state: GameState) -> tuple:
+    """col0_gaps, king_traps and chained counted by scanning every cell"""
+    cells = state.cells
+    col0_gaps = sum(1 for slot in range(0, NUM_SLOTS, COLS) if cells[slot] == GAP)
+    king_traps = sum(
+        1 for slot in range(NUM_SLOTS)
+        if slot % COLS and cells[slot] == GAP and CARD_RANK[cells[slot - 1]] == 13
+    )
+    chained = sum(
+        1 for slot in range(NUM_SLOTS)
+        if slot % COLS and cells[slot] != GAP and cells[slot] == cells[slot - 1] + 1
+    )
+    return col0_gaps, king_traps, chained
+
+
+def walk_positions(seeds, steps: int = 60):
+    """Copies of the positions along seeded random walks"""
+    return [state.copy() for seed in seeds for state in random_walk(seed, steps)]
+
+
+def locked_position(lengths, rng: random.Random) -> GameState:
+    """Row r locked from 2 of suit r for lengths[r] cards, everything else shuffled"""
+    cells = [GAP] * NUM_SLOTS
+    for row, length in enumerate(lengths):
+        for col in range(length):
+            cells[row * COLS + col] = encode_card(col + 2, row)
+    rest = [code for code in DECK if code not in cells] + [GAP] * 4
+    rng.shuffle(rest)
+    free = [slot for slot in range(NUM_SLOTS) if slot % COLS >= lengths[slot // COLS]]
+    for slot, code in zip(free, rest):
+        cells[slot] = code
+    return GameState.from_key(bytes(code & 0xFF for code in cells))
+
+
+def growable_rows(before: GameState, after: GameState) -> int:
+    """Rows of before whose run grew in the redeal after, or can grow by filling the cell after it"""
+    rows = 0
+    for row in range(ROWS):
+        length = before.locked_len[row]
+        if length == COLS - 1:
+            continue
+        cell = row * COLS + length
+        if after.locked_len[row] > length or (
+                after.cells[cell] == GAP and moves_into(after.cells, after.loc, cell)):
+            rows += 1
+    return rows
+
+
+class IncrementalFeaturesTest(unittest.TestCase):
+    def test_counters_match_full_scan_through_moves_and_undo(self):
+        for seed in range(100):
+            tokens = []
+            for state in random_walk(seed, tokens=tokens):
+                self.assertEqual((state.col0_gaps, state.king_traps, state.chained), recount(state))
+            while tokens:
+                state.undo_move(tokens.pop())
+                self.assertEqual((state.col0_gaps, state.king_traps, state.chained), recount(state))
+
+    def test_cached_score_is_restored_by_undo(self):
+        evaluator = Evaluator(DEFAULT_WEIGHTS)
+        state = deal(random.Random(7))
+        before = evaluator.evaluate(state)
+        token = state.apply_move(state.legal_moves()[0])
+        self.assertEqual(evaluator.evaluate(state), evaluator.score(features(state)))
+        state.undo_move(token)
+        self.assertEqual(state._evaluation_cache, (evaluator, before))
+
+    def test_unknown_weight_is_rejected(self):
+        with self.assertRaises(ValueError):
+            Evaluator({"no_such_feature": 1.0})
+
+
+class WeightsFileTest(unittest.TestCase):
+    def test_round_trip(self):
+        weights = dict(DEFAULT_WEIGHTS, locked=1.25, chained=-0.125)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "nested", "weights.json")
+            self.assertEqual(load_weights(path), {})
+            save_weights(weights, path, games=10, r_squared=0.5)
+            self.assertEqual(load_weights(path), weights)
+        self.assertEqual(Evaluator(weights).weight_dict(), weights)
+
+
+class RedealTableTest(unittest.TestCase):
+    def test_table_matches_monte_carlo_redeals(self):
+        rng = random.Random(0)
+        deals = 10000
+        for lengths in ((0, 0, 0, 0), (12, 4, 0, 1), (12, 12, 7, 0)):
+            state = locked_position(lengths, rng)
+            moves = rows = 0
+            for _ in range(deals):
+                redealt = redeal(state, rng)
+                moves += len(redealt.legal_moves())
+                rows += growable_rows(state, redealt)
+            expected_moves, expected_rows = redeal_expectation(state)
+            self.assertAlmostEqual(moves / deals, expected_moves, delta=0.06)
+            self.assertAlmostEqual(rows / deals, expected_rows, delta=0.03)
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class BatchEvaluatorTest(unittest.TestCase):
+    def test_batch_scores_are_bit_identical(self):
+        positions = walk_positions(range(100))
+        # Greedy self-play reaches long locked runs that random walks rarely do
+        for seed in range(10):
+            record = play_game(seed, Evaluator(DEFAULT_WEIGHTS))
+            positions.extend(GameState.from_key(key) for key in record.boards[::5])
+        self.assertGreater(max(state.locked_count() for state in positions), 20)
+        boards, _ = stack_states(positions)
+        weights = dict(DEFAULT_WEIGHTS, chained=0.1, row_imbalance=-0.3, locked=1.7)
+        for evaluator in (Evaluator(DEFAULT_WEIGHTS), Evaluator(weights)):
+            scores = evaluate_batch(boards, evaluator)
+            values = features_batch(boards)
+            for index, state in enumerate(positions):
+                self.assertEqual(tuple(values[index]), features(state))
+                self.assertEqual(scores[index], evaluator.evaluate(state))
+
+
+if __name__ == "__main__":
+    unittest.main()
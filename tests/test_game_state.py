@@ -0,0 +1,123 @@
+"""Make/unmake and incremental-state invariants of GameState."""
+
+import random
+import unittest
+
+from src.simulator.cards import COLS, GAP, encode_card, encode_move
+from src.simulator.game_state import GameState, deal
+from tests.helpers import random_walk, snapshot
+
+
+def derived(state: GameState) -> tuple:
+    """Fields derived from the cells, independent of the order gaps were opened in"""
+    fields = list(snapshot(state))
+    fields[3] = tuple(sorted(state.gap_slots))
+    return tuple(fields)
+
+
+def cascade_position() -> GameState:
+    """Row 1 is gap, 3C, 4C, 5C, ... with 2C in row 2, so playing 2C locks four cards at once"""
+    cells = [GAP] * (4 * COLS)
+    cells[1:4] = [encode_card(3, 0), encode_card(4, 0), encode_card(5, 0)]
+    rest = [code for code in range(52) if code % 13 and code not in cells]
+    rest.remove(encode_card(2, 0))
+    slots = [slot for slot in range(4, 4 * COLS) if slot not in (COLS, 2 * COLS, 3 * COLS)]
+    for slot, code in zip(slots, [encode_card(2, 0)] + rest):
+        cells[slot] = code
+    return GameState.from_key(bytes(code & 0xFF for code in cells))
+
+
+class ApplyUndoTest(unittest.TestCase):
+    def test_undo_restores_every_field(self):
+        for seed in range(100):
+            tokens, history = [], []
+            for state in random_walk(seed, tokens=tokens):
+                history.append(snapshot(state))
+            history.pop()  # The position the walk ended on
+            while tokens:
+                state.undo_move(tokens.pop())
+                self.assertEqual(snapshot(state), history.pop())
+
+    def test_incremental_state_matches_rebuild(self):
+        for seed in range(100):
+            for state in random_walk(seed):
+                self.assertEqual(derived(state), derived(GameState.from_key(state.to_key())))
+
+    def test_lock_cascade(self):
+        state = cascade_position()
+        before = snapshot(state)
+        self.assertEqual(state.locked_len[0], 0)
+        token = state.apply_move(encode_move(state.card_slot(encode_card(2, 0)), 0))
+        self.assertEqual(state.locked_len[0], 4)
+        self.assertEqual(state.locked_suit[0], 0)
+        self.assertEqual(derived(state), derived(GameState.from_key(state.to_key())))
+        state.undo_move(token)
+        self.assertEqual(snapshot(state), before)
+
+
+class KeyTest(unittest.TestCase):
+    def test_round_trip(self):
+        state = deal(random.Random(3))
+        self.assertEqual(GameState.from_key(state.to_key()), state)
+
+    def test_invalid_keys_are_rejected(self):
+        valid = deal(random.Random(3)).to_key()
+        ace = bytes(52)  # Code 0 is the Ace of clubs, which is not in the deck
+        out_of_range = bytes([60]) + valid[1:]
+        duplicate = valid[:1] * 2 + valid[2:]
+        for key in (ace, out_of_range, duplicate, valid[:51]):
+            with self.assertRaises(ValueError):
+                GameState.from_key(key)
+
+
+
+class FlatBoardTest(unittest.TestCase):
+    def test_round_trip(self):
+        for seed in range(20):
+            for state in random_walk(seed, steps=30):
+                loaded = GameState.from_flat(state.to_flat())
+                self.assertEqual(loaded, state)
+                self.assertEqual(snapshot(loaded), snapshot(GameState.from_key(state.to_key())))
+
+    def test_accepted_spellings(self):
+        flat = deal(random.Random(3)).to_flat()
+        expected = GameState.from_flat(flat)
+        four_of_clubs = flat.index("4C")
+        gaps = [slot for slot, name in enumerate(flat) if name == "--"]
+        for spelling in ("4c", "4C"):
+            self.assertEqual(GameState.from_flat(flat[:four_of_clubs] + [spelling] + flat[four_of_clubs + 1:]),
+                             expected)
+        for spelling in ("-", "g", " "):
+            respelled = list(flat)
+            for slot in gaps:
+                respelled[slot] = spelling
+            self.assertEqual(GameState.from_flat(respelled), expected)
+
+    def test_invalid_boards_are_rejected(self):
+        flat = deal(random.Random(3)).to_flat()
+        card = next(slot for slot, name in enumerate(flat) if name != "--")
+        duplicate = list(flat)
+        duplicate[card + 1 if flat[card + 1] != "--" else card - 1] = flat[card]
+        missing = list(flat)
+        missing[card] = "--"
+        bad_token = list(flat)
+        bad_token[card] = "c3"
+        for board in (duplicate, missing, bad_token, flat[:51], flat + ["--"]):
+            with self.assertRaises(ValueError):
+                GameState.from_flat(board)
+
+    def test_locked_lengths_ignore_mistyped_cards(self):
+        state = cascade_position()
+        state.apply_move(encode_move(state.card_slot(encode_card(2, 0)), 0))
+        flat = state.to_flat()
+        self.assertEqual(GameState.locked_lengths(flat), state.locked_len)
+        flat[COLS + 5] = "c3"  # Mistyped card outside every locked run, as in saves/31870.json
+        flat[2 * COLS] = "zz"
+        self.assertEqual(GameState.locked_lengths(flat), state.locked_len)
+        flat[2] = "c3"  # Mistyped card inside row 1's run cuts it short
+        self.assertEqual(GameState.locked_lengths(flat)[0], 2)
+        self.assertEqual(GameState.locked_lengths(flat[:30]), [2, 0, 0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
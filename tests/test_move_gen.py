@@ -0,0 +1,210 @@
+"""Legal move generation against a brute-force reference."""
+
+import random
+import unittest
+
+from src.simulator.cards import (
+    CARD_RANK, CARD_SUCC, COLS, DECK, GAP, NUM_SLOTS, IS_ROW_START, MOVE_SHIFT, MOVE_MASK
+)
+from src.simulator.game_state import GameState
+from src.simulator.move_gen import (
+    MACRO_MOVE_MASK, MACRO_SHIFT, MAX_MOVES, MoveStack, apply_macro, chain_length, encode_macro,
+    generate_macro_moves, generate_moves, independent, sleep_set_children, undo_macro
+)
+from tests.helpers import random_walk, snapshot
+
+try:
+    import numpy as np
+    from src.simulator.batch import board_gaps, generate_moves_batch, stack_states
+except ImportError:  # NumPy is optional outside the batch components
+    np = None
+
+
+def reached(state: GameState, depth: int, keys: set, sleep=None) -> int:
+    """
+    Add the keys of the positions depth moves below state, with sleep sets unless
+    sleep is None, and return the number of nodes visited.
+    """
+    if depth == 0:
+        keys.add(state.to_key())
+        return 1
+    nodes = 1
+    moves = list(state.legal_moves())
+    children = ((move, None) for move in moves) if sleep is None else sleep_set_children(moves, sleep)
+    for move, child_sleep in children:
+        token = state.apply_move(move)
+        nodes += reached(state, depth - 1, keys, child_sleep)
+        state.undo_move(token)
+    return nodes
+
+
+def brute_force_moves(state: GameState) -> set:
+    """Every legal move found by trying each unlocked card against each gap"""
+    moves = set()
+    cells = state.cells
+    for gap in range(NUM_SLOTS):
+        if cells[gap] != GAP:
+            continue
+        for src in range(NUM_SLOTS):
+            card = cells[src]
+            if card == GAP or src % COLS < state.locked_len[src // COLS]:
+                continue
+            if gap % COLS == 0:
+                legal = CARD_RANK[card] == 2
+            else:
+                legal = cells[gap - 1] != GAP and CARD_SUCC[cells[gap - 1]] == card
+            if legal:
+                moves.add((src << MOVE_SHIFT) | gap)
+    return moves
+
+
+class LegalMovesTest(unittest.TestCase):
+    def test_legal_moves_match_brute_force(self):
+        stack = MoveStack(1)
+        for seed in range(100):
+            for state in random_walk(seed, steps=80):
+                expected = brute_force_moves(state)
+                self.assertEqual(set(state.legal_moves()), expected)
+                self.assertEqual(len(state.legal_moves()), len(expected))
+                self.assertEqual(set(generate_moves(state)), expected)
+                count = stack.generate(state, 0)
+                self.assertEqual(set(stack.buffers[0][:count]), expected)
+
+    def test_boards_with_extra_gaps(self):
+        stack = MoveStack(1)
+        rng = random.Random(0)
+        most = 0
+        for gaps in (8, 16, 24, 32, 40):
+            for _ in range(200):
+                cells = rng.sample(DECK, NUM_SLOTS - gaps) + [GAP] * gaps
+                rng.shuffle(cells)
+                state = GameState.from_key(bytes(code & 0xFF for code in cells), validate=False)
+                count = stack.generate(state, 0)
+                self.assertEqual(sorted(stack.buffers[0][:count]), sorted(brute_force_moves(state)))
+                most = max(most, count)
+        self.assertGreater(most, MAX_MOVES)
+
+    def test_cached_moves_survive_undo(self):
+        for seed in range(50):
+            tokens = []
+            for state in random_walk(seed, steps=40, tokens=tokens):
+                state.legal_moves()  # Fill the per-gap cache that undo_move maintains
+            while tokens:
+                state.undo_move(tokens.pop())
+                self.assertEqual(set(state.legal_moves()), brute_force_moves(state))
+
+
+class StuckTest(unittest.TestCase):
+    def test_is_stuck_exactly_when_no_moves(self):
+        stuck_positions = 0
+        for seed in range(100):
+            for state in random_walk(seed, steps=2000):
+                stuck = not brute_force_moves(state)
+                self.assertEqual(state.is_stuck(), stuck)
+                stuck_positions += stuck
+        self.assertGreater(stuck_positions, 0)  # The walks must actually reach dead ends
+
+
+
+class MacroMoveTest(unittest.TestCase):
+    def test_chains_are_forced_and_undone_exactly(self):
+        for seed in range(50):
+            for state in random_walk(seed, steps=30):
+                before = snapshot(state)
+                for move in list(state.legal_moves()):
+                    tokens = apply_macro(state, encode_macro(move))
+                    played = [token[0] for token in tokens]
+                    self.assertEqual(played[0], move)
+                    # Each step fills the gap the previous step opened
+                    for previous, step in zip(played, played[1:]):
+                        self.assertEqual(step & MOVE_MASK, previous >> MOVE_SHIFT)
+                    # The chain stops at a column-0 gap or a dead gap
+                    last_gap = played[-1] >> MOVE_SHIFT
+                    self.assertTrue(IS_ROW_START[last_gap] or state.dead_gaps >> last_gap & 1)
+                    undo_macro(state, tokens)
+                    self.assertEqual(snapshot(state), before)
+
+    def test_step_limit(self):
+        for seed in range(50):
+            for state in random_walk(seed, steps=30):
+                before = snapshot(state)
+                for move in list(state.legal_moves()):
+                    length = chain_length(state, move)
+                    for steps in range(1, length + 2):
+                        tokens = apply_macro(state, encode_macro(move, steps))
+                        self.assertEqual(len(tokens), min(steps, length))
+                        undo_macro(state, tokens)
+                self.assertEqual(snapshot(state), before)
+
+    def test_all_stops(self):
+        for seed in range(50):
+            for state in random_walk(seed, steps=30):
+                moves = state.legal_moves()
+                self.assertEqual(generate_macro_moves(state), [encode_macro(move) for move in moves])
+                macros = generate_macro_moves(state, all_stops=True)
+                for move in moves:
+                    stops = sorted(macro >> MACRO_SHIFT for macro in macros if macro & MACRO_MOVE_MASK == move)
+                    self.assertEqual(stops, list(range(1, chain_length(state, move) + 1)))
+
+
+
+class IndependenceTest(unittest.TestCase):
+    def test_independent_moves_commute(self):
+        pairs = 0
+        for seed in range(100):
+            for state in random_walk(seed, steps=40):
+                moves = list(state.legal_moves())
+                for first in moves:
+                    for second in moves:
+                        if first == second or not independent(first, second):
+                            continue
+                        pairs += 1
+                        keys = []
+                        for a, b in ((first, second), (second, first)):
+                            token = state.apply_move(a)
+                            self.assertIn(b, state.legal_moves())
+                            inner = state.apply_move(b)
+                            keys.append(state.to_key())
+                            state.undo_move(inner)
+                            state.undo_move(token)
+                        self.assertEqual(keys[0], keys[1])
+        self.assertGreater(pairs, 0)
+
+    def test_sleep_sets_reach_every_position(self):
+        full_nodes = reduced_nodes = 0
+        for seed in range(10):
+            for state in random_walk(seed, steps=10):
+                full, reduced = set(), set()
+                full_nodes += reached(state, 5, full)
+                reduced_nodes += reached(state, 5, reduced, ())
+                self.assertEqual(reduced, full)
+        self.assertLess(reduced_nodes, full_nodes)
+
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class BatchMovesTest(unittest.TestCase):
+    def test_batch_moves_match_generate_moves(self):
+        positions = [state.copy() for seed in range(100) for state in random_walk(seed)]
+        moves, counts = generate_moves_batch(*stack_states(positions))
+        self.assertEqual(moves.shape[0], len(positions))
+        for index, state in enumerate(positions):
+            count = counts[index]
+            self.assertEqual(sorted(moves[index][:count].tolist()), sorted(generate_moves(state)))
+            self.assertTrue(np.all(moves[index][count:] == -1))
+
+    def test_board_gaps_needs_four_gaps(self):
+        boards, _ = stack_states([state.copy() for state in random_walk(0, steps=2)])
+        self.assertEqual(board_gaps(boards).shape, (len(boards), 4))
+        extra = boards.copy()
+        extra[1, np.flatnonzero(boards[1] != GAP)[0]] = GAP  # Five gaps on one board
+        with self.assertRaises(ValueError):
+            board_gaps(extra)
+        missing = boards.copy()
+        missing[0, board_gaps(boards)[0, 0]] = 5  # Three gaps on one board
+        with self.assertRaises(ValueError):
+            board_gaps(missing)
+
+
+if __name__ == "__main__":
+    unittest.main()
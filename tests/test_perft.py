@@ -0,0 +1,38 @@
+"""Perft node counts."""
+
+import random
+import unittest
+
+from src.simulator.game_state import deal
+from src.simulator.perft import divide, perft
+from tests.helpers import random_walk, snapshot
+
+
+class PerftTest(unittest.TestCase):
+    def test_table_does_not_change_counts(self):
+        for seed in range(10):
+            state = deal(random.Random(seed))
+            for depth in range(7):
+                self.assertEqual(perft(state, depth, {}), perft(state, depth))
+
+    def test_divide_sums_to_perft(self):
+        for seed in range(10):
+            for state in random_walk(seed, steps=10):
+                before = snapshot(state)
+                for depth in range(1, 5):
+                    results = divide(state, depth)
+                    self.assertEqual([move for move, _ in results], list(state.legal_moves()))
+                    self.assertEqual(sum(count for _, count in results), perft(state, depth))
+                self.assertEqual(snapshot(state), before)
+
+    def test_invalid_depths_are_rejected(self):
+        state = deal(random.Random(0))
+        self.assertEqual(perft(state, 0), 1)
+        with self.assertRaises(ValueError):
+            perft(state, -1)
+        with self.assertRaises(ValueError):
+            divide(state, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
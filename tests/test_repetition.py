@@ -0,0 +1,32 @@
+"""Path-local repetition detection."""
+
+import unittest
+
+from src.simulator.repetition import RepetitionTable
+
+
+class RepetitionTableTest(unittest.TestCase):
+    def test_enter_and_leave(self):
+        table = RepetitionTable()
+        self.assertTrue(table.enter(1))
+        self.assertTrue(table.enter(2))
+        self.assertFalse(table.enter(1))
+        self.assertEqual(table.cycles, 1)
+        self.assertIn(1, table)
+        table.leave(2)
+        self.assertNotIn(2, table)
+        self.assertEqual(len(table), 1)
+        self.assertTrue(table.enter(2))
+        self.assertEqual(table.stats(), {"probes": 4, "cycles": 1, "depth": 2})
+
+    def test_clear_keeps_counters(self):
+        table = RepetitionTable()
+        table.enter(7)
+        table.enter(7)
+        table.clear()
+        self.assertEqual(len(table), 0)
+        self.assertEqual(table.stats(), {"probes": 2, "cycles": 1, "depth": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+"""Row and suit symmetry canonicalization."""
+
+import random
+import unittest
+
+from src.simulator.cards import COLS, ROWS, GAP, CARD_RANK, CARD_SUIT, encode_card
+from src.simulator.game_state import GameState
+from src.simulator.symmetry import canonical_key, untransform_move
+from tests.helpers import random_walk
+
+
+def relabel(state: GameState, row_order, suit_map) -> GameState:
+    """The position with row i taken from row_order[i] and every suit s renamed suit_map[s]"""
+    cells = []
+    for row in row_order:
+        for code in state.cells[row * COLS:(row + 1) * COLS]:
+            cells.append(GAP if code == GAP else encode_card(CARD_RANK[code], suit_map[CARD_SUIT[code]]))
+    return GameState.from_key(bytes(code & 0xFF for code in cells))
+
+
+class CanonicalKeyTest(unittest.TestCase):
+    def test_symmetric_positions_share_a_canonical_key(self):
+        rng = random.Random(0)
+        for seed in range(30):
+            for state in random_walk(seed, steps=20):
+                row_order = rng.sample(range(ROWS), ROWS)
+                suit_map = rng.sample(range(4), 4)
+                twin = relabel(state, row_order, suit_map)
+                self.assertEqual(twin.canonicalize()[0], state.canonicalize()[0])
+
+    def test_canonical_moves_map_back_onto_legal_moves(self):
+        for seed in range(30):
+            for state in random_walk(seed, steps=20):
+                key, transform = state.canonicalize()
+                canonical = GameState.from_key(key)
+                mapped = [untransform_move(move, transform) for move in canonical.legal_moves()]
+                self.assertEqual(sorted(mapped), sorted(state.legal_moves()))
+                self.assertEqual(len(set(mapped)), len(mapped))
+
+    def test_canonical_key_is_a_fixed_point(self):
+        for seed in range(10):
+            key, _ = canonical_key(next(random_walk(seed)).to_key())
+            self.assertEqual(canonical_key(key)[0], key)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+"""Evaluator weight fitting and dataset files."""
+
+import os
+import tempfile
+import unittest
+
+from src.simulator.evaluator import FEATURE_NAMES
+
+try:
+    import numpy as np
+    from src.simulator.tuning import build_dataset, fit_weights, load_dataset, save_dataset
+except ImportError:  # The tuning command requires NumPy
+    np = None
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class FitWeightsTest(unittest.TestCase):
+    def test_recovers_known_weights(self):
+        rng = np.random.default_rng(0)
+        features = rng.normal(size=(500, len(FEATURE_NAMES)))
+        true_weights = np.array([1.0, 0.5, -0.5, -0.1, 0.25, 2.0])
+        weights, intercept, r_squared = fit_weights(features, features @ true_weights + 3.0)
+        for name, expected in zip(FEATURE_NAMES, true_weights):
+            self.assertAlmostEqual(weights[name], expected, places=9)
+        self.assertAlmostEqual(intercept, 3.0, places=9)
+        self.assertAlmostEqual(r_squared, 1.0, places=9)
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class DatasetTest(unittest.TestCase):
+    def test_round_trip(self):
+        data = build_dataset(range(2))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "nested", "selfplay.npz")
+            save_dataset(path, data)
+            loaded = load_dataset(path)
+        self.assertEqual(set(loaded), set(data))
+        for name, values in data.items():
+            np.testing.assert_array_equal(loaded[name], values)
+
+    def test_mismatched_features_are_rejected(self):
+        data = build_dataset(range(1))
+        data["feature_names"] = np.array(FEATURE_NAMES[:-1] + ("retired_feature",))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "selfplay.npz")
+            save_dataset(path, data)
+            with self.assertRaises(ValueError):
+                load_dataset(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Value network model files and inference."""
+
+import os
+import tempfile
+import unittest
+
+from src.simulator.evaluator import load_evaluator
+from tests.helpers import random_walk
+
+try:
+    import numpy as np
+    from src.simulator.batch import stack_states
+    from src.simulator.tuning import build_dataset
+    from src.simulator.value_net import ValueNet, encode_boards, train
+except ImportError:  # The value network requires NumPy
+    np = None
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class ValueNetTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        data = build_dataset(range(10))
+        cls.net, cls.metrics = train(data["boards"], data["final_locked"], hidden=(16, 8),
+                                     epochs=3, groups=data["seed"])
+        cls.positions = [state.copy() for seed in range(5) for state in random_walk(seed, steps=20)]
+        cls.boards, _ = stack_states(cls.positions)
+
+    def test_training_reports_metrics(self):
+        self.assertEqual(set(self.metrics), {"train_rmse", "validation_rmse", "baseline_rmse"})
+        for value in self.metrics.values():
+            self.assertTrue(np.isfinite(value))
+
+    def test_save_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "nested", "value_net.npz")
+            self.net.save(path)
+            loaded = ValueNet.load(path)
+            network = load_evaluator("network", path)
+        expected = self.net.evaluate_batch(self.boards)
+        np.testing.assert_array_equal(loaded.evaluate_batch(self.boards), expected)
+        np.testing.assert_array_equal(network.evaluate_batch(self.boards), expected)
+
+    def test_evaluate_matches_batch(self):
+        scores = self.net.evaluate_batch(self.boards)
+        for index, state in enumerate(self.positions):
+            single = self.net.evaluate_batch(stack_states([state])[0])
+            self.assertEqual(self.net.evaluate(state), single[0])
+            self.assertEqual(self.net.evaluate(state), single[0])  # Served from the cache
+            # BLAS may sum in a different order for other batch sizes
+            self.assertAlmostEqual(single[0], scores[index], places=4)
+
+    def test_input_size_mismatch_is_rejected(self):
+        inputs = encode_boards(self.boards[:1]).shape[1]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "value_net.npz")
+            ValueNet.initialize(inputs + 1, (4,)).save(path)
+            with self.assertRaises(ValueError):
+                ValueNet.load(path)
+
+
+class LoadEvaluatorTest(unittest.TestCase):
+    def test_unknown_kind_is_rejected(self):
+        with self.assertRaises(ValueError):
+            load_evaluator("bogus")
+
+
+if __name__ == "__main__":
+    unittest.main()